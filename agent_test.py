@@ -3,10 +3,13 @@ tests to run and debug your minimax and alphabeta agents locally.  The test
 cases used by the project assistant are not public.
 """
 
+import time
 import unittest
 
 import isolation
 import game_agent
+import sample_players
+import tournament
 
 from importlib import reload
 
@@ -20,6 +23,122 @@ class IsolationTest(unittest.TestCase):
         self.player2 = "Player2"
         self.game = isolation.Board(self.player1, self.player2)
 
+    def test_knight_moves_respect_edges_and_blocked_cells(self):
+        self.game.apply_move((0, 0))
+        self.game.apply_move((1, 2))
+        self.assertEqual(self.game.get_legal_moves(self.player1), [(2, 1)])
+        self.assertEqual(sorted(self.game.get_legal_moves(self.player2)),
+                         [(0, 4), (2, 0), (2, 4), (3, 1), (3, 3)])
+        self.assertFalse(self.game.move_is_legal((1, 2)))
+        self.assertEqual(len(self.game.get_blank_spaces()), 47)
+
+    def test_pop_restores_pushed_moves(self):
+        self.game.apply_move((3, 3))
+        before = self.game.to_string()
+        self.game.push((6, 6))
+        self.game.push((1, 2))
+        self.assertEqual(self.game.pop(), (1, 2))
+        self.assertEqual(self.game.pop(), (6, 6))
+        self.assertEqual(self.game.to_string(), before)
+        self.assertEqual(self.game.move_count, 1)
+        self.assertEqual(self.game.active_player, self.player2)
+        self.assertEqual(self.game.get_player_location(self.player2), None)
+
+    def test_move_order_is_stable_or_seeded(self):
+        stable = isolation.Board(self.player1, self.player2, shuffle=False)
+        stable.apply_move((3, 3))
+        stable.apply_move((0, 0))
+        self.assertEqual(stable.get_legal_moves(),
+                         [(1, 2), (1, 4), (2, 1), (2, 5),
+                          (4, 1), (4, 5), (5, 2), (5, 4)])
+
+        orders = []
+        for _ in range(2):
+            seeded = isolation.Board(self.player1, self.player2, seed=7)
+            seeded.apply_move((3, 3))
+            seeded.apply_move((0, 0))
+            orders.append([seeded.get_legal_moves() for _ in range(3)])
+        self.assertEqual(orders[0], orders[1])
+
+    def test_legal_moves_are_cached_per_state(self):
+        self.game.apply_move((3, 3))
+        self.game.apply_move((0, 0))
+        moves = self.game.get_legal_moves()
+        moves.clear()
+        self.assertEqual(len(self.game.get_legal_moves()), 8)
+        self.game.push((1, 2))
+        self.assertEqual(self.game.get_legal_moves(), [(2, 1)])
+        self.game.pop()
+        self.assertEqual(len(self.game.get_legal_moves()), 8)
+        self.assertEqual(self.game.utility(self.player1), 0.)
+
+    def test_symmetric_positions_share_canonical_key(self):
+        corner = self.game.forecast_move((0, 0))
+        other_corner = self.game.forecast_move((6, 0))
+        center = self.game.forecast_move((3, 3))
+        self.assertEqual(corner.canonical_key(), other_corner.canonical_key())
+        self.assertNotEqual(corner.canonical_key(), center.canonical_key())
+        self.assertEqual(corner.canonical().canonical_key(), corner.canonical_key())
+        self.assertEqual(len(game_agent.unique_moves(
+            self.game, self.game.get_legal_moves())), 10)
+
+    def test_partition_and_longest_path(self):
+        # On a 3x3 board the center cell is cut off from the 8-cell ring
+        game = isolation.Board(self.player1, self.player2, width=3, height=3)
+        game.apply_move((0, 0))
+        self.assertFalse(game.is_partitioned())
+        game.apply_move((1, 1))
+        self.assertTrue(game.is_partitioned())
+        self.assertEqual(game.longest_path(self.player1), 7)
+        self.assertEqual(game.longest_path(self.player2), 0)
+
+    def test_serialization_round_trip(self):
+        for move in [(3, 3), (0, 0), (1, 2)]:
+            self.game.apply_move(move)
+        data = self.game.to_bytes()
+        self.assertEqual(len(data), 10)
+        restored = isolation.Board.from_bytes(data, self.player1, self.player2)
+        self.assertEqual(restored.to_string(), self.game.to_string())
+        self.assertEqual(restored.hash(), self.game.hash())
+        self.assertEqual(restored.move_count, 3)
+        self.assertEqual(restored.active_player, self.player2)
+        self.assertEqual(restored.to_int(), self.game.to_int())
+
+    def test_large_board_blank_spaces(self):
+        game = isolation.Board(self.player1, self.player2, width=31, height=31)
+        game.apply_move((30, 0))
+        game.apply_move((15, 15))
+        blanks = game.get_blank_spaces()
+        self.assertEqual(len(blanks), 959)
+        self.assertEqual(game.count_blank_spaces(), 959)
+        self.assertNotIn((30, 0), blanks)
+        self.assertEqual(blanks[:2], [(0, 0), (1, 0)])
+        self.assertIn(" 1 | ", game.to_string())
+
+    def test_iter_play_yields_one_record_per_ply(self):
+        player1 = sample_players.RandomPlayer()
+        player2 = sample_players.RandomPlayer()
+        game = isolation.Board(player1, player2)
+        records = list(game.iter_play())
+        final = records[-1]
+        self.assertEqual(final.termination, "illegal move")
+        self.assertEqual(final.legal_move_count, 0)
+        self.assertIs(final.player, game.active_player)
+        self.assertIs(final.winner, game.inactive_player)
+        self.assertEqual(len(records) - 1, game.move_count)
+        self.assertEqual([r.ply for r in records], list(range(len(records))))
+        self.assertTrue(all(r.termination is None for r in records[:-1]))
+
+    def test_hash_tracks_state(self):
+        empty_hash = self.game.hash()
+        self.game.push((3, 3))
+        forecast = isolation.Board(self.player1, self.player2)
+        forecast = forecast.forecast_move((3, 3))
+        self.assertEqual(self.game.hash(), forecast.hash())
+        self.assertNotEqual(self.game.hash(), empty_hash)
+        self.game.pop()
+        self.assertEqual(self.game.hash(), empty_hash)
+
 
 class MiniMaxPlayerTest(unittest.TestCase):
 
@@ -43,6 +162,318 @@ class MiniMaxPlayerTest(unittest.TestCase):
         self.assertIsInstance(move, tuple)
         self.assertEqual(move, (-1, -1))
 
+    def test_minimax_collects_stats(self):
+        self.assertIsNone(self.player1.stats)
+        self.player1.collect_stats = True
+        self.game.apply_move((3, 3))
+        self.game.apply_move((0, 0))
+        moves = self.game.get_legal_moves()
+        # The stats are checked, not the speed, so the clock never runs out
+        self.player1.get_move(self.game, isolation.Timer(10 ** 6))
+        stats = self.player1.stats
+        self.assertEqual(stats.depth_completed, 3)
+        # Depth 3 visits the root and at least every one of its children
+        self.assertGreater(stats.nodes, 1 + len(moves))
+        self.assertGreater(stats.nodes_per_second, 0)
+
+    def test_minimax_accepts_timer(self):
+        move = self.player1.get_move(self.game, isolation.Timer(0))
+        self.assertEqual(move, (-1, -1))
+        timer = isolation.Timer(1000)
+        self.assertFalse(timer.expired())
+        self.assertTrue(timer.expired(margin=2000))
+        self.assertTrue(0 < timer() <= 1000)
+
+
+class AlphaBetaPlayerTest(unittest.TestCase):
+
+    def setUp(self):
+        reload(game_agent)
+        self.player1 = game_agent.AlphaBetaPlayer(endgame_solver=True)
+        self.player2 = game_agent.AlphaBetaPlayer()
+        self.game = isolation.Board(self.player1, self.player2, width=3, height=3)
+
+    def test_endgame_value_of_separated_players(self):
+        self.player1.time_left = isolation.Timer(10 ** 6)
+        self.game.apply_move((1, 1))
+        self.assertIsNone(self.player1.endgame_value(self.game))
+        self.game.apply_move((0, 0))
+        self.assertEqual(self.player1.endgame_value(self.game), float("-inf"))
+
+    def test_endgame_solver_stops_on_the_search_clock(self):
+        # One of the slowest 16-cell regions to solve from scratch found by
+        # a local search over connected regions of the 7x7 board, which
+        # takes longer than a whole TIMER_THRESHOLD here
+        idx, region = 27, 284199046690
+        player = game_agent.AlphaBetaPlayer(endgame_solver=True, timeout=5.)
+        time_left = isolation.Timer(8)
+        player.time_left = time_left
+        isolation.isolation._LONGEST_PATHS.clear()
+        with self.assertRaises(game_agent.SearchTimeout):
+            isolation.isolation.longest_path(7, 7, idx, region ^ 1 << idx,
+                                             player.count_node)
+        self.assertGreater(time_left(), 0)
+        self.assertGreater(player.nodes_searched(), 0)
+
+    def test_unfinished_placement_search_falls_back_to_centre(self):
+        game = isolation.Board(self.player2, self.player1, width=31, height=31)
+        self.assertEqual(self.player2.get_move(game, isolation.Timer(0)),
+                         (15, 15))
+        self.assertEqual(self.player2.depth_completed, 0)
+
+    def test_solved_search_returns_early_with_legal_move(self):
+        self.game.apply_move((0, 0))
+        self.game.apply_move((2, 2))
+        time_left = isolation.Timer(1000)
+        move = self.player1.get_move(self.game, time_left)
+        self.assertIn(move, self.game.get_legal_moves())
+        self.assertTrue(self.player1.solved)
+        self.assertEqual(self.player1.root_value, float("-inf"))
+        self.assertGreater(time_left(), 500)
+
+    def test_transposition_table_replacement(self):
+        table = game_agent.TranspositionTable(size=4)
+        exact = game_agent.TranspositionTable.EXACT
+        table.store(1, 5, exact, 1.0, (0, 0))
+        table.store(5, 2, exact, 2.0, (1, 1))
+        self.assertEqual(table.lookup(1)[1], 5)
+        self.assertEqual(table.lookup(5)[3], 2.0)
+        # A deeper entry takes the depth-preferred slot and demotes the old one
+        table.store(9, 7, exact, 3.0, (2, 2))
+        self.assertEqual(table.lookup(9)[4], (2, 2))
+        self.assertEqual(table.lookup(1)[1], 5)
+        self.assertIsNone(table.lookup(5))
+        self.assertIsNone(table.lookup(2))
+        # An entry of an older generation yields to a shallower new one
+        table.generation += 1
+        table.store(13, 1, exact, 4.0, (0, 1))
+        self.assertEqual(table.lookup(13)[5], table.generation)
+        self.assertEqual(table.lookup(9)[1], 7)
+        self.assertIsNone(table.lookup(1))
+
+    def test_tables_are_kept_within_a_game_only(self):
+        player = game_agent.AlphaBetaPlayer(tt_size=1 << 12, killer_moves=True)
+        opponent = sample_players.RandomPlayer()
+        game = isolation.Board(player, opponent)
+        game.apply_move((3, 3))
+        game.apply_move((0, 0))
+        root_key = game.hash()
+        move = player.get_move(game, isolation.Timer(30))
+        game.apply_move(move)
+        game.apply_move(game.get_legal_moves()[0])
+        player.get_move(game, isolation.Timer(30))
+        self.assertEqual(player.tt.generation, game.move_count)
+        self.assertIsNotNone(player.tt.lookup(root_key))
+
+        new_game = isolation.Board(opponent, player)
+        new_game.apply_move((0, 1))
+        player.get_move(new_game, isolation.Timer(30))
+        self.assertIsNone(player.tt.lookup(root_key))
+
+    def test_alphabeta_with_transposition_table_returns_legal_move(self):
+        player = game_agent.AlphaBetaPlayer(tt_size=1 << 10)
+        game = isolation.Board(player, self.player2)
+        game.apply_move((3, 3))
+        game.apply_move((0, 0))
+        move = player.get_move(game, isolation.Timer(50))
+        self.assertIn(move, game.get_legal_moves())
+        self.assertGreater(len(player.tt), 0)
+
+    def test_transposition_table_keeps_root_value(self):
+        def root_value(moves, depth, player=None):
+            player = player or game_agent.AlphaBetaPlayer(
+                score_fn=sample_players.improved_score)
+            game = isolation.Board(player, self.player2, shuffle=False)
+            for move in moves:
+                game.apply_move(move)
+            player.time_left = isolation.Timer(10 ** 6)
+            move = player.alphabeta(game, depth)
+            return player.root_value, move
+
+        opening = [(3, 3), (2, 3), (5, 4), (4, 5)]
+        player = game_agent.AlphaBetaPlayer(
+            score_fn=sample_players.improved_score, tt_size=1 << 12)
+        for depth in range(1, 6):
+            player.tt.clear()
+            self.assertEqual(root_value(opening, depth)[0],
+                             root_value(opening, depth, player)[0])
+
+        # A depth 6 search stores every state two plies down with the depth
+        # a depth 4 search from there needs, but with other windows
+        player.tt.clear()
+        _, move = root_value(opening, 6, player)
+        after = isolation.Board(player, self.player2, shuffle=False)
+        for opening_move in opening + [move]:
+            after.apply_move(opening_move)
+        for reply in after.get_legal_moves():
+            line = opening + [move, reply]
+            self.assertEqual(root_value(line, 4)[0],
+                             root_value(line, 4, player)[0])
+        self.assertGreater(player.tt_hits, 0)
+
+    def test_principal_variation_is_playable_line(self):
+        player = game_agent.AlphaBetaPlayer(pv_ordering=True)
+        game = isolation.Board(player, self.player2)
+        game.apply_move((3, 3))
+        game.apply_move((0, 0))
+        move = player.get_move(game, isolation.Timer(50))
+        self.assertEqual(player.pv[0], move)
+        for pv_move in player.pv:
+            self.assertIn(pv_move, game.get_legal_moves())
+            game.apply_move(pv_move)
+
+    def test_pondering_fills_table_for_replies(self):
+        player = game_agent.AlphaBetaPlayer(ponder=True)
+        game = isolation.Board(player, self.player2)
+        game.apply_move((3, 3))
+        game.apply_move((0, 0))
+        move = player.get_move(game, isolation.Timer(50))
+        results = (player.root_value, player.solved, player.pv,
+                   player.cutoffs, player.tt_hits)
+        time.sleep(0.02)
+        player.stop_pondering()
+        # The background search keeps the results of the last turn intact
+        self.assertEqual((player.root_value, player.solved, player.pv,
+                          player.cutoffs, player.tt_hits), results)
+        after = game.forecast_move(move)
+        replies = [after.forecast_move(m) for m in after.get_legal_moves()]
+        self.assertTrue(any(player.tt.lookup(r.hash()) for r in replies))
+        reply = replies[0]
+        self.assertIn(player.get_move(reply, isolation.Timer(50)),
+                      reply.get_legal_moves())
+        player.stop_pondering()
+
+    def test_parallel_search_returns_legal_move(self):
+        # The workers are ready once the player is created, so even the
+        # first turn has its whole time limit to search
+        player = game_agent.AlphaBetaPlayer(processes=2)
+        game = isolation.Board(player, self.player2)
+        game.apply_move((3, 3))
+        game.apply_move((0, 0))
+        try:
+            for _ in range(2):
+                move = player.get_move(game, isolation.Timer(200))
+                self.assertIn(move, game.get_legal_moves())
+                self.assertGreater(player.depth_completed, 0)
+        finally:
+            player.close()
+
+    def test_pvs_and_aspiration_windows_keep_root_value(self):
+        values = []
+        for options in [{}, {"pvs": True}, {"aspiration_window": 0.5},
+                        {"pvs": True, "aspiration_window": 0.1}]:
+            player = game_agent.AlphaBetaPlayer(
+                score_fn=sample_players.improved_score, **options)
+            game = isolation.Board(player, self.player2, shuffle=False)
+            for move in [(3, 3), (0, 0), (1, 2), (2, 1)]:
+                game.apply_move(move)
+            player.time_left = isolation.Timer(10 ** 6)
+            for depth in range(1, 6):
+                player.aspiration_search(game, depth)
+                player.depth_completed = depth
+            values.append(player.root_value)
+        self.assertEqual(values, [values[0]] * 4)
+
+    def test_killer_and_history_tables_record_cutoffs(self):
+        player = game_agent.AlphaBetaPlayer(killer_moves=True,
+                                            history_heuristic=True)
+        game = isolation.Board(player, self.player2)
+        game.apply_move((3, 3))
+        game.apply_move((0, 0))
+        move = player.get_move(game, isolation.Timer(50))
+        self.assertIn(move, game.get_legal_moves())
+        self.assertGreater(player.cutoffs, 0)
+        self.assertLessEqual(player.killer_cutoffs + player.history_cutoffs,
+                             player.cutoffs)
+        self.assertTrue(player.killers)
+        self.assertTrue(player.history[0] or player.history[1])
+
+
+class TournamentTest(unittest.TestCase):
+
+    def setUp(self):
+        reload(game_agent)
+        reload(tournament)
+        # A short time limit leaves the least slack for late clock checks
+        tournament.TIME_LIMIT = 40
+
+    def test_amortized_clock_checks_cause_no_timeouts(self):
+        cpu_agent = tournament.Agent(
+            game_agent.AlphaBetaPlayer(score_fn=sample_players.center_score),
+            "AB_Center")
+        test_agents = [
+            tournament.Agent(game_agent.AlphaBetaPlayer(
+                score_fn=sample_players.improved_score), "AB_Improved"),
+            tournament.Agent(game_agent.AlphaBetaPlayer(
+                tt_size=1 << 12, pvs=True, killer_moves=True,
+                collect_stats=True), "AB_Custom")]
+        wins = {agent.player: 0 for agent in test_agents}
+        wins[cpu_agent.player] = 0
+        search_stats = {}
+        timeouts, forfeits = tournament.play_round(
+            cpu_agent, test_agents, wins, 1, search_stats)
+        self.assertEqual((timeouts, forfeits), (0, 0))
+        self.assertEqual(sum(wins.values()), 4)
+        self.assertEqual(list(search_stats), [test_agents[1].player])
+        nodes, _, depth, _, _ = tournament.summarize_stats(
+            search_stats[test_agents[1].player])
+        self.assertGreater(nodes, 0)
+        self.assertGreater(depth, 0)
+
+
+class MCTSPlayerTest(unittest.TestCase):
+
+    def setUp(self):
+        reload(game_agent)
+        self.player1 = game_agent.MCTSPlayer()
+        self.player2 = sample_players.RandomPlayer()
+        self.game = isolation.Board(self.player1, self.player2)
+
+    def test_mcts_reuses_subtree_of_reply(self):
+        self.game.apply_move((3, 3))
+        self.game.apply_move((0, 0))
+        move = self.player1.get_move(self.game, isolation.Timer(50))
+        self.assertIn(move, self.game.get_legal_moves())
+        self.assertGreater(self.player1.iterations, 0)
+        self.assertGreater(self.player1.iterations_per_second, 0)
+
+        self.game.apply_move(move)
+        reply = self.game.get_legal_moves()[0]
+        self.game.apply_move(reply)
+        node = self.player1.root.children[reply]
+        visits = node.visits
+        self.player1.get_move(self.game, isolation.Timer(50))
+        self.assertIn(self.player1.root, node.children.values())
+        self.assertEqual(node.visits, visits + self.player1.iterations)
+
+    def test_mcts_does_not_time_out_in_full_games(self):
+        for _ in range(2):
+            player = game_agent.MCTSPlayer()
+            game = isolation.Board(player, self.player2)
+            _, _, termination = game.play(time_limit=60)
+            self.assertNotEqual(termination, "timeout")
+
+
+@unittest.skipIf(game_agent.BoardBatch is None, "NumPy is not installed")
+class BoardBatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.game = isolation.Board("Player1", "Player2")
+        for move in [(3, 3), (0, 0), (1, 2), (2, 1), (2, 4)]:
+            self.game.apply_move(move)
+
+    def test_batch_scores_match_single_board_scores(self):
+        moves = self.game.get_legal_moves()
+        children = [self.game.forecast_move(m) for m in moves]
+        batch = isolation.BoardBatch.from_children(self.game, moves)
+        for player in ("Player1", "Player2"):
+            self.assertEqual(
+                list(game_agent.custom_score_batch(batch, player)),
+                [game_agent.custom_score(c, player) for c in children])
+            self.assertEqual(
+                list(sample_players.improved_score_batch(batch, player)),
+                [sample_players.improved_score(c, player) for c in children])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,67 @@
+"""Measure how deep `AlphaBetaPlayer` searches within a fixed time budget on
+boards of increasing size.
+
+For every board size, the benchmark replays a number of random openings and
+asks an alpha-beta agent for a move in each position, recording the depth of
+the last iterative deepening pass that completed before the timer expired.
+The first row of each size is the opening placement on the empty board,
+which has the largest branching factor. Set PROCESSES to measure the
+parallel search instead.
+"""
+import random
+
+from isolation import Board, Timer
+from game_agent import AlphaBetaPlayer, custom_score
+from sample_players import improved_score
+
+BOARD_SIZES = [7, 15, 21, 31]  # square board sizes to benchmark
+NUM_POSITIONS = 5  # number of random positions per board size
+OPENING_MOVES = 8  # number of random moves played before each position
+TIME_LIMIT = 150  # number of milliseconds per move
+PROCESSES = None  # worker processes for a parallel search (None for serial)
+
+
+def depth_reached(player, game, time_limit):
+    """Return the depth completed by the player when searching the game for
+    time_limit milliseconds.
+    """
+    player.get_move(game, Timer(time_limit))
+    return player.depth_completed
+
+
+def benchmark(score_fn, size, num_positions):
+    """Return the depth reached on the empty board followed by the depths
+    reached in num_positions random mid-game positions.
+    """
+    player = AlphaBetaPlayer(score_fn=score_fn, processes=PROCESSES)
+    game = Board(player, "opponent", width=size, height=size)
+    depths = [depth_reached(player, game, TIME_LIMIT)]
+
+    while len(depths) <= num_positions:
+        game = Board(player, "opponent", width=size, height=size)
+        for _ in range(OPENING_MOVES):
+            moves = game.get_legal_moves()
+            if not moves:
+                break
+            game.apply_move(random.choice(moves))
+        if game.active_player == player and game.get_legal_moves():
+            depths.append(depth_reached(player, game, TIME_LIMIT))
+    player.close()
+    return depths
+
+
+def main():
+    print("{:^7}{:^15}{:^9}{:^9}{:^9}{:^9}".format(
+        "Board", "Score", "Opening", "Min", "Mean", "Max"))
+    for size in BOARD_SIZES:
+        for name, score_fn in [("improved", improved_score),
+                               ("custom", custom_score)]:
+            depths = benchmark(score_fn, size, NUM_POSITIONS)
+            midgame = depths[1:]
+            print("{:^7}{:^15}{:^9}{:^9}{:^9.1f}{:^9}".format(
+                "{0}x{0}".format(size), name, depths[0], min(midgame),
+                sum(midgame) / len(midgame), max(midgame)))
+
+
+if __name__ == "__main__":
+    main()
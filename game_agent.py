@@ -3,12 +3,45 @@
     test your agent's strength against a set of known agents using tournament.py
     and include the results in your report.
 """
+import multiprocessing
 import random
+import threading
+from collections import namedtuple
+from math import log, nextafter, sqrt
+from time import perf_counter_ns
+
+from isolation.isolation import Board, Timer, knight_neighbors
+
+try:
+    import numpy as np
+    from isolation.batch import BoardBatch
+except ImportError:
+    np = BoardBatch = None
+
+
+# Largest region (in open cells) that the exact endgame solver will search
+ENDGAME_CELLS = 16
+
+# Transposition table size used by pondering players that were not given one
+PONDER_TT_SIZE = 1 << 16
+
+# Number of clock checks the search aims to make per TIMER_THRESHOLD of time
+CHECKS_PER_THRESHOLD = 10
+
 
 class SearchTimeout(Exception):
     """Subclass base exception for code clarity. """
     pass
 
+
+# Summary of the search done by one call to get_move: the number of nodes
+# visited, the milliseconds used, the node rate, the depth of the last
+# completed pass, and the number of cutoffs and transposition table hits
+SearchStats = namedtuple("SearchStats", ["nodes", "time_used",
+                                         "nodes_per_second",
+                                         "depth_completed", "cutoffs",
+                                         "tt_hits"])
+
 def look_ahead_moves(game, moves):
     """
         Extends each move from the passed moves in each direction, filters the
@@ -27,13 +60,45 @@ def look_ahead_moves(game, moves):
         list<(int, int)>
             A list of legal look ahead moves.
     """
-    move_directions = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
-                     (1, -2), (1, 2), (2, -1), (2, 1)]
-    
-    return [(r + dr, c + dc)
+    neighbors = knight_neighbors(game.width, game.height)
+    blocked = game.blocked
+    height = game.height
+
+    return [move
             for r, c in moves
-            for dr, dc in move_directions
-            if game.move_is_legal((r + dr, c + dc))]
+            for j, move in neighbors[r + c * height]
+            if not blocked >> j & 1]
+
+
+def unique_moves(game, moves):
+    """
+        Filters the passed moves down to one move per class of symmetric
+        successor states, e.g., the 10 distinct opening placements on an
+        empty 7x7 board instead of all 49.
+
+        Parameters
+        ----------
+        game : `isolation.Board`
+            An instance of `isolation.Board` encoding the current state of the
+            game (e.g., player locations and blocked cells).
+        moves : list<(int, int)>
+            A list of legal moves
+
+        Returns
+        -------
+        list<(int, int)>
+            The first move of each symmetry class, in the passed order.
+    """
+    seen = set()
+    unique = []
+    for move in moves:
+        game.push(move)
+        key = game.canonical_key()
+        game.pop()
+        if key not in seen:
+            seen.add(key)
+            unique.append(move)
+    return unique
 
 
 def opponent_distance(location, other_location):
@@ -90,7 +155,7 @@ def occupation(game):
             The occupation rate
     """
     all_spaces = game.width * game.height
-    occupied_spaces = all_spaces - len(game.get_blank_spaces())
+    occupied_spaces = all_spaces - game.count_blank_spaces()
     return float(occupied_spaces / all_spaces)
 
 
@@ -143,6 +208,43 @@ def custom_score(game, player):
                     + (len(own_blocking_moves) - len(opp_blocking_moves)) * o)
 
 
+def custom_score_batch(batch, player):
+    """
+        Batched counterpart of `custom_score` that scores every position of
+        an `isolation.BoardBatch` at once.
+
+        Parameters
+        ----------
+        batch : `isolation.BoardBatch`
+            A batch of game states (e.g., all children of a search node).
+
+        player : object
+            A player instance registered in every game state of the batch.
+
+        Returns
+        -------
+        numpy.ndarray
+            The heuristic value of each game state to the specified player.
+    """
+    side = batch.side(player)
+    values = batch.terminal_values(player)
+
+    own_moves = batch.legal_moves(side)
+    opp_moves = batch.legal_moves(1 - side)
+
+    own_la_moves = batch.look_ahead_counts(own_moves)
+    opp_la_moves = batch.look_ahead_counts(opp_moves)
+
+    own_blocking_moves = (own_moves & opp_moves).sum(axis=1)
+    opp_blocking_moves = (opp_moves & (own_la_moves > 0)).sum(axis=1)
+
+    o = batch.occupancy()
+
+    scores = (own_la_moves.sum(axis=1) - opp_la_moves.sum(axis=1)
+              + (own_blocking_moves - opp_blocking_moves) * o)
+    return np.where(values == 0, scores, values)
+
+
 def custom_score_2(game, player):
     """
         Calculate the heuristic value of a game state from the point of view
@@ -228,11 +330,82 @@ def custom_score_3(game, player):
     return float(len(own_moves) - len(opp_moves) + (own_center_distance - opp_center_distance) / o)
 
 
+class TranspositionTable(object):
+    """
+        Fixed-capacity transposition table keyed by `isolation.Board.hash()`.
+
+        The table has two tiers of `size` slots each, indexed by the low bits
+        of the key. A new entry goes to the depth-preferred tier if it was
+        searched at least as deep as the entry in that slot (which is then
+        demoted to the always-replace tier), and to the always-replace tier
+        otherwise.
+
+        Each entry is a tuple `(key, depth, flag, value, move, generation)`,
+        where `flag` is one of `EXACT`, `LOWER` or `UPPER` and tells whether
+        `value` is the exact value of the state searched to `depth` plies, or
+        a lower or upper bound on it; `move` is the best move found in the
+        state. Entries are tagged with the table's `generation` when stored,
+        and an entry from an older generation gives up its depth-preferred
+        slot to any new entry, so the table can be kept from one search to
+        the next.
+
+        Parameters
+        ----------
+        size : int (optional)
+            The number of slots per tier, rounded up to a power of two.
+    """
+    EXACT, LOWER, UPPER = 0, 1, 2
+
+    def __init__(self, size=1 << 16):
+        size = 1 << max(size - 1, 0).bit_length()
+        self._mask = size - 1
+        self._deep = [None] * size
+        self._recent = [None] * size
+        self.generation = 0
+
+    def __len__(self):
+        return sum(entry is not None for entry in self._deep + self._recent)
+
+    def clear(self):
+        """Remove all entries from the table. """
+        self._deep = [None] * len(self._deep)
+        self._recent = [None] * len(self._recent)
+
+    def lookup(self, key):
+        """Return the entry stored for the key, or None if there is none. """
+        idx = key & self._mask
+        entry = self._deep[idx]
+        if entry is not None and entry[0] == key:
+            return entry
+        entry = self._recent[idx]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key, depth, flag, value, move):
+        """Store the result of searching the state with the given key. """
+        idx = key & self._mask
+        entry = (key, depth, flag, value, move, self.generation)
+        deep = self._deep[idx]
+        if deep is None or deep[0] == key:
+            self._deep[idx] = entry
+        elif depth >= deep[1] or deep[5] != self.generation:
+            self._deep[idx] = entry
+            self._recent[idx] = deep
+        else:
+            self._recent[idx] = entry
+
+
 class IsolationPlayer:
     """Base class for minimax and alphabeta agents -- this class is never
     constructed or tested directly.
 
-    ********************  DO NOT MODIFY THIS CLASS  ********************
+    Besides the search settings, this class owns the turn clock shared by
+    all agents: assigning `time_left` prepares `check_time`, which search
+    nodes call whenever their `_nodes_to_check` countdown runs out (or
+    through `count_node`), and `nodes_searched` and `record_stats` report
+    the work done since.
+    `score_children` scores a node's children with `batch_score`.
 
     Parameters
     ----------
@@ -249,13 +422,123 @@ class IsolationPlayer:
         Time remaining (in milliseconds) when search is aborted. Should be a
         positive value large enough to allow the function to return before the
         timer expires.
+
+    batch_score_fn : callable (optional)
+        A batched counterpart of `score_fn` (e.g., `custom_score_batch`) that
+        scores a whole `isolation.BoardBatch`. If given (and NumPy is
+        available), the minimax nodes right above the search horizon score
+        all of their children with a single call. Building a batch costs
+        more than scoring the 8 or so children of a 7x7 node one at a time,
+        so this is slower than `score_fn` at those branching factors.
+
+    collect_stats : bool (optional)
+        If True, every call to `get_move` leaves a `SearchStats` record of
+        its search in `self.stats`.
     """
 
-    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10.):
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10.,
+                 batch_score_fn=None, collect_stats=False):
         self.search_depth = search_depth
         self.score = score_fn
-        self.time_left = None
         self.TIMER_THRESHOLD = timeout
+        self.time_left = None
+        self.batch_score = batch_score_fn if BoardBatch is not None else None
+        self.collect_stats = collect_stats
+        self.stats = None
+
+    @property
+    def time_left(self):
+        """The function that returns the number of milliseconds left in the
+        current turn.
+
+        Assigning it also prepares the cheap check used by `check_time`,
+        which aborts the search once `self._clock() > self._clock_limit`.
+        For an `isolation.Timer` that is a raw `perf_counter_ns()`
+        comparison against its deadline; any other callable is checked
+        against `time_left()`. Since the clock is only read about once per
+        `TIMER_THRESHOLD / CHECKS_PER_THRESHOLD`, the limit is that much
+        more than `TIMER_THRESHOLD` before the end of the turn, so that a
+        search that notices it late still returns with `TIMER_THRESHOLD`
+        to spare.
+        """
+        return self._time_left
+
+    @time_left.setter
+    def time_left(self, time_left):
+        self._time_left = time_left
+        margin = self.TIMER_THRESHOLD * (1. + 1. / CHECKS_PER_THRESHOLD)
+        if isinstance(time_left, Timer):
+            self._clock = perf_counter_ns
+            self._clock_limit = time_left.deadline - int(margin * 1000000)
+        else:
+            self._clock = lambda: margin - time_left()
+            self._clock_limit = 0
+        # The first node checks the clock and starts measuring the node rate
+        self._nodes_to_check = 0
+        self._check_interval = 0
+        self._nodes_checked = 0
+        self._last_check = perf_counter_ns()
+
+    def check_time(self):
+        """Raise `SearchTimeout` if the clock limit has passed, and otherwise
+        set how many nodes the search may visit before the next check.
+
+        Search nodes count down `self._nodes_to_check` and only call this
+        method when it reaches zero. The interval is scaled by the node rate
+        measured since the last check, so that the clock is read about
+        CHECKS_PER_THRESHOLD times per TIMER_THRESHOLD and the search does
+        not run past its limit by more than a fraction of the threshold.
+        The countdown doubles as the node counter read by `nodes_searched`.
+        """
+        visited = self._check_interval - self._nodes_to_check
+        self._nodes_checked += visited
+        self._check_interval = self._nodes_to_check = 0
+        if self._clock() > self._clock_limit:
+            raise SearchTimeout()
+        now = perf_counter_ns()
+        elapsed = now - self._last_check
+        self._last_check = now
+        period = self.TIMER_THRESHOLD * 1000000 / CHECKS_PER_THRESHOLD
+        interval = 1
+        if elapsed > 0:
+            # Grow at most twofold per check so a burst of cheap nodes cannot
+            # schedule a long stretch without checks
+            interval = max(1, min(int(visited * period / elapsed), 2 * visited))
+        self._check_interval = interval
+        self._nodes_to_check = interval
+
+    def count_node(self):
+        """Count one search node and check the clock if the countdown has
+        run out, for work done outside the player's own search methods
+        (e.g., the states of the exact endgame solver).
+        """
+        self._nodes_to_check -= 1
+        if self._nodes_to_check <= 0:
+            self.check_time()
+
+    def nodes_searched(self):
+        """Return the number of search nodes visited since `time_left` was
+        last assigned.
+        """
+        return self._nodes_checked + self._check_interval - self._nodes_to_check
+
+    def record_stats(self, start, depth_completed, cutoffs=0, tt_hits=0,
+                     extra_nodes=0):
+        """Store a `SearchStats` record in `self.stats` for a search that
+        started at the `perf_counter_ns()` value `start`, counting the nodes
+        visited since `time_left` was assigned plus `extra_nodes`.
+        """
+        nodes = self.nodes_searched() + extra_nodes
+        elapsed = (perf_counter_ns() - start) / 1e9
+        self.stats = SearchStats(nodes, elapsed * 1000.,
+                                 nodes / elapsed if elapsed else 0.,
+                                 depth_completed, cutoffs, tt_hits)
+
+    def score_children(self, game, moves):
+        """Return the heuristic values of the states reached by applying each
+        of the moves to the game, scored with a single `batch_score` call.
+        """
+        return self.batch_score(BoardBatch.from_children(game, moves), self)
 
 
 class MinimaxPlayer(IsolationPlayer):
@@ -293,19 +576,25 @@ class MinimaxPlayer(IsolationPlayer):
             (-1, -1) if there are no available legal moves.
         """
         self.time_left = time_left
+        start = perf_counter_ns()
 
         # Initialize the best move so that this function returns something
         # in case the search fails due to timeout
         best_move = (-1, -1)
+        depth_completed = 0
 
         try:
             # The try/except block will automatically catch the exception
             # raised when the timer is about to expire.
-            return self.minimax(game, self.search_depth)
+            best_move = self.minimax(game, self.search_depth)
+            depth_completed = self.search_depth
 
         except SearchTimeout:
             pass  # Handle any actions required after timeout as needed
 
+        if self.collect_stats:
+            self.record_stats(start, depth_completed)
+
         # Return the best move from the last completed search iteration
         return best_move
 
@@ -349,15 +638,21 @@ class MinimaxPlayer(IsolationPlayer):
                     each helper function or else your agent will timeout during
                     testing.
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        self._nodes_to_check -= 1
+        if self._nodes_to_check <= 0:
+            self.check_time()
 
         best_score = float('-inf')
         best_move = (-1, -1)
 
+        # Search on a private copy that is mutated in-place with push/pop, so
+        # the caller's board is left untouched even if the search times out
+        game = game.copy()
+
         for move in game.get_legal_moves():
-            moved_game = game.forecast_move(move)
-            move_score = self.min_value(moved_game, depth - 1)
+            game.push(move)
+            move_score = self.min_value(game, depth - 1)
+            game.pop()
             if move_score > best_score:
                 best_move = move
                 best_score = move_score
@@ -383,19 +678,24 @@ class MinimaxPlayer(IsolationPlayer):
             float
                 The game state's best value from the players perspective.
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        self._nodes_to_check -= 1
+        if self._nodes_to_check <= 0:
+            self.check_time()
 
         legal_moves = game.get_legal_moves()
 
         if len(legal_moves) == 0 or depth == 0:
             return self.score(game, self)
 
+        if depth == 1 and self.batch_score is not None:
+            return float(self.score_children(game, legal_moves).max())
+
         best_value = float('-inf')
 
         for move in legal_moves:
-            moved_game = game.forecast_move(move)
-            best_value = max(best_value, self.min_value(moved_game, depth - 1))
+            game.push(move)
+            best_value = max(best_value, self.min_value(game, depth - 1))
+            game.pop()
 
         return best_value
 
@@ -419,18 +719,23 @@ class MinimaxPlayer(IsolationPlayer):
                 The game state's best value from the opponents perspective.
         """
 
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        self._nodes_to_check -= 1
+        if self._nodes_to_check <= 0:
+            self.check_time()
 
         legal_moves = game.get_legal_moves()
 
         if len(legal_moves) == 0 or depth == 0:
             return self.score(game, self)
 
+        if depth == 1 and self.batch_score is not None:
+            return float(self.score_children(game, legal_moves).min())
+
         best_value = float('inf')
         for move in legal_moves:
-            moved_game = game.forecast_move(move)
-            best_value = min(best_value, self.max_value(moved_game, depth - 1))
+            game.push(move)
+            best_value = min(best_value, self.max_value(game, depth - 1))
+            game.pop()
 
         return best_value
 
@@ -440,8 +745,203 @@ class AlphaBetaPlayer(IsolationPlayer):
         Game-playing agent that chooses a move using iterative deepening minimax
         search with alpha-beta pruning. You must finish and test this player to
         make sure it returns a good move before the search time limit expires.
+
+        Parameters
+        ----------
+        symmetry_pruning : bool (optional)
+            If True, the root search skips moves whose successor states are
+            mirror images or rotations of a successor already searched.
+
+        endgame_solver : bool (optional)
+            If True, positions in which the players have been separated are
+            scored exactly by solving both players' longest knight paths
+            (when each region has at most `ENDGAME_CELLS` open cells) instead
+            of being searched to the horizon.
+
+        tt_size : int (optional)
+            The number of slots per tier of a `TranspositionTable` used for
+            cutoffs and to try the best move of earlier searches first; None
+            disables the table.
+
+        pv_ordering : bool (optional)
+            If True, each iterative deepening pass searches the principal
+            variation of the previous pass first at every level.
+
+        killer_moves : bool (optional)
+            If True, the last two moves that caused a cutoff at each ply are
+            tried right after the principal variation and table moves.
+
+        history_heuristic : bool (optional)
+            If True, the remaining moves are ordered by a history table that
+            scores each destination cell (for each side) by the cutoffs it
+            caused, weighted by the remaining depth.
+
+        ponder : bool (optional)
+            If True, after returning a move the player keeps searching the
+            opponent's replies in a background thread, for at most as long
+            as its own turn lasted, and the next call to `get_move` reuses
+            that work through the transposition table. The background search
+            runs on a separate player with the same settings that shares
+            only the table, so the attributes below always describe the last
+            call to `get_move`. Pondering stops when `get_move` or
+            `stop_pondering` is called. The thread shares the interpreter
+            with everything else in the process, including an opponent
+            playing in the same `Board.play` game.
+
+        processes : int (optional)
+            If given, `get_move` splits the root moves among this many worker
+            processes, each running iterative deepening over its share with
+            its own copy of the player, and picks the best move at the
+            deepest depth every worker completed. The workers are started,
+            and waited for, when the player is created (so that their
+            start-up is not charged to the first turn) and reused until
+            `close` is called; `start_workers` starts them again. The score
+            functions must be picklable (e.g., module-level functions).
+
+        pvs : bool (optional)
+            If True, the search is a principal variation search: only the
+            first move of each state is searched with the full window, and
+            the others with a null window that is widened again only if the
+            move turns out to be better.
+
+        aspiration_window : float (optional)
+            If given, each iterative deepening pass after the first searches
+            the window of this half-width around the previous pass's root
+            value, and repeats the pass with a full window if the value falls
+            outside of it.
+
+        See `IsolationPlayer` for the remaining parameters.
+
+        Attributes
+        ----------
+        cutoffs : int
+            The number of cutoffs in the last call to `get_move`, of which
+            `first_move_cutoffs` were caused by the first move searched,
+            `killer_cutoffs` by a killer move and `history_cutoffs` by another
+            move with a positive history score. `aspiration_failures` counts
+            the passes that had to be repeated with a full window, and
+            `tt_hits` the transposition table lookups that found an entry.
+
+        root_value : float
+            The value of the root in the last completed search pass.
+
+        solved : bool
+            True if the last completed pass reached no depth-limited leaf or
+            proved a win or loss, in which case `get_move` returns without
+            searching deeper.
+
+        depth_completed : int
+            The depth of the last search pass completed by `get_move` (for a
+            parallel search, the depth the chosen move was compared at), or
+            0 if none completed.
     """
 
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10.,
+                 symmetry_pruning=False, endgame_solver=False, tt_size=None,
+                 pv_ordering=False, killer_moves=False,
+                 history_heuristic=False, ponder=False, processes=None,
+                 pvs=False, aspiration_window=None, collect_stats=False):
+        super().__init__(search_depth=search_depth, score_fn=score_fn,
+                         timeout=timeout, collect_stats=collect_stats)
+        # Options for the players run by the worker processes and for the
+        # player that ponders in the background
+        self._worker_options = dict(
+            search_depth=search_depth, score_fn=score_fn, timeout=timeout,
+            symmetry_pruning=symmetry_pruning,
+            endgame_solver=endgame_solver, tt_size=tt_size,
+            pv_ordering=pv_ordering, killer_moves=killer_moves,
+            history_heuristic=history_heuristic, pvs=pvs)
+        self.symmetry_pruning = symmetry_pruning
+        self.endgame_solver = endgame_solver
+        self.tt = TranspositionTable(tt_size) if tt_size else None
+        self.pv_ordering = pv_ordering
+        self.killer_moves = killer_moves
+        self.history_heuristic = history_heuristic
+        self.ponder = ponder
+        if ponder and self.tt is None:
+            self.tt = TranspositionTable(PONDER_TT_SIZE)
+        self._ponderer = None
+        self._ponder_thread = None
+        self.processes = processes
+        self._pool = None
+        if processes:
+            self.start_workers()
+        self.pvs = pvs
+        self.aspiration_window = aspiration_window
+
+        # Principal variation of the last completed pass, and the one being
+        # collected by the current pass (one line per ply from the root)
+        self.pv = []
+        self._pv_lines = []
+        self._follow_pv = False
+        self._root_ply = 0
+
+        # Result of the last completed pass; the pass is solved when no
+        # branch was cut off by the depth limit or a win or loss is proven
+        self.root_value = None
+        self.solved = False
+        self.depth_completed = 0
+        self._horizon_reached = False
+
+        # Killer moves by ply from the root and history scores by side (0 for
+        # the player, 1 for the opponent) and destination cell
+        self.killers = {}
+        self.history = ({}, {})
+        self.reset_counters()
+        self._worker_nodes = 0
+
+        # The players, blocked cells and move count of the last state passed
+        # to `get_move`, used to tell whether the tables can be kept
+        self._last_searched = None
+
+    def reset_counters(self):
+        """ Set the cutoff and transposition table hit counters to zero. """
+        self.tt_hits = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.killer_cutoffs = 0
+        self.history_cutoffs = 0
+        self.aspiration_failures = 0
+
+    def endgame_value(self, game):
+        """
+            Calculates the exact value of a game state in which the players
+            can no longer reach each other.
+
+            Parameters
+            ----------
+            game : isolation.Board
+                An instance of the Isolation game `Board` class representing the
+                current game state
+
+            Returns
+            -------
+            float or None
+                +inf if the player wins, -inf if it loses, or None if the
+                players are not separated or a region is too large to solve.
+
+            Raises
+            ------
+            SearchTimeout
+                If the search clock runs out while solving; every state the
+                solver visits counts as a search node.
+        """
+        if not game.is_partitioned():
+            return None
+
+        active, inactive = game.active_player, game.inactive_player
+        for player in (active, inactive):
+            if bin(game.reachable_cells(player)).count("1") > ENDGAME_CELLS:
+                return None
+
+        # The player to move runs out of moves first unless its longest
+        # path is strictly longer than the opponent's
+        active_wins = (game.longest_path(active, self.count_node) >
+                       game.longest_path(inactive, self.count_node))
+        if active_wins == (active == self):
+            return float("inf")
+        return float("-inf")
+
     def get_move(self, game, time_left):
         """
             Search for the best move from the available legal moves and return a
@@ -473,26 +973,375 @@ class AlphaBetaPlayer(IsolationPlayer):
                 Board coordinates corresponding to a legal move; may return
                 (-1, -1) if there are no available legal moves.
         """
+        self.stop_pondering()
         self.time_left = time_left
+        start = perf_counter_ns()
+        turn_time = time_left()
+
+        self.prepare_tables(game)
+        self.pv = []
+        self.reset_counters()
+        self.depth_completed = 0
 
         # Initialize the best move so that this function returns something
-        # in case the search fails due to timeout
-        best_move = (-1, -1)
+        # in case the search fails due to timeout; on large boards even the
+        # first pass may not complete, so fall back to any legal move
+        legal_moves = game.get_legal_moves()
+        best_move = legal_moves[0] if legal_moves else (-1, -1)
 
+        # A piece that has not been placed yet can move to any open cell, so
+        # on large boards not even a search_depth pass may finish in time;
+        # start those searches from a single ply, and fall back to the open
+        # cell nearest the centre rather than to the first one (a corner)
         depth = self.search_depth
+        if game.get_player_location(game.active_player) is None:
+            depth = 1
+            if legal_moves:
+                best_move = min(legal_moves, key=lambda m: (
+                    (2 * m[0] - game.height + 1)**2
+                    + (2 * m[1] - game.width + 1)**2))
+
+        if self.tt is not None:
+            _, tt_move = self.probe(game, 0, float("-inf"), float("inf"))
+            if tt_move in legal_moves:
+                best_move = tt_move
+
+        if self.processes and len(legal_moves) > 1:
+            best_move = self.parallel_search(game, legal_moves, best_move)
+            if self.collect_stats:
+                self.record_stats(start, self.depth_completed,
+                                  extra_nodes=self._worker_nodes)
+            if self.ponder:
+                self.start_pondering(game.forecast_move(best_move), turn_time)
+            return best_move
 
         # Increase the search depth by 1 until the search times out
         try:
             while(True):
-                best_move = self.alphabeta(game, depth)
+                best_move = self.aspiration_search(game, depth)
+                self.depth_completed = depth
+                if self.pv_ordering:
+                    self.pv = list(self._pv_lines[0])
+
+                # A deeper pass would search the same tree again, so return
+                # early and leave the rest of the turn unused (or to pondering)
+                if self.solved:
+                    break
                 depth += 1
         except SearchTimeout:
             pass  # Handle any actions required after timeout as needed
 
+        if self.collect_stats:
+            self.record_stats(start, self.depth_completed, self.cutoffs,
+                              self.tt_hits)
+
+        if self.ponder and best_move in legal_moves:
+            self.start_pondering(game.forecast_move(best_move), turn_time)
+
         # Return the best move from the last completed search iteration
         return best_move
 
-    def alphabeta(self, game, depth, alpha=float("-inf"), beta=float("inf")):
+    def prepare_tables(self, game):
+        """
+            Keeps the transposition, killer and history tables of earlier
+            searches if the game state continues the game they searched, and
+            clears them if it belongs to a new game.
+
+            A continuation has the same two players in the same order and
+            includes every blocked cell of the last searched state. The
+            table generation then moves on to the new state, the killer
+            moves are shifted to the new root ply and the history scores are
+            halved, so that the newest results take precedence.
+
+            Parameters
+            ----------
+            game : isolation.Board
+                The game state about to be searched
+        """
+        players = (game.active_player, game.inactive_player)
+        if game.move_count % 2:
+            players = players[::-1]
+        last = self._last_searched
+        self._last_searched = (players, game.blocked, game.move_count)
+
+        if (last is None or last[0] != players or
+                last[1] & ~game.blocked or last[2] >= game.move_count):
+            if self.tt is not None:
+                self.tt.clear()
+            self.killers = {}
+            self.history = ({}, {})
+        else:
+            shift = game.move_count - self._root_ply
+            self.killers = {ply - shift: moves
+                            for ply, moves in self.killers.items()
+                            if ply >= shift}
+            self.history = tuple({move: score // 2
+                                  for move, score in history.items()}
+                                 for history in self.history)
+        if self.tt is not None:
+            self.tt.generation = game.move_count
+
+    def aspiration_search(self, game, depth):
+        """
+            Searches the game state with `alphabeta`, using an aspiration
+            window around the root value of the previous pass if enabled.
+
+            Parameters
+            ----------
+            game : isolation.Board
+                An instance of the Isolation game `Board` class representing the
+                current game state
+
+            depth : int
+                Depth is an integer representing the maximum number of plies to
+                search in the game tree before aborting
+
+            Returns
+            -------
+            (int, int)
+                The board coordinates of the best move found in the search.
+        """
+        previous = self.root_value if self.depth_completed else None
+        if (self.aspiration_window is None or previous is None or
+                previous in (float("inf"), float("-inf"))):
+            return self.alphabeta(game, depth)
+
+        alpha = previous - self.aspiration_window
+        beta = previous + self.aspiration_window
+        move = self.alphabeta(game, depth, alpha, beta)
+        if alpha < self.root_value < beta:
+            return move
+        self.aspiration_failures += 1
+        return self.alphabeta(game, depth)
+
+    def search_moves(self, game, moves, time_left):
+        """
+            Runs iterative deepening over the specified root moves only, as
+            done by each worker process of a parallel search.
+
+            Parameters
+            ----------
+            game : isolation.Board
+                An instance of the Isolation game `Board` class representing the
+                current game state
+
+            moves : list<(int, int)>
+                The root moves to search
+
+            time_left : callable
+                A function that returns the number of milliseconds left for
+                the search
+
+            Returns
+            -------
+            list<(int, (int, int), float, bool)>
+                One `(depth, move, value, solved)` tuple per completed pass,
+                holding the best of the moves and its value.
+        """
+        self.time_left = time_left
+        if self.tt is not None:
+            self.tt.clear()
+        self.pv = []
+        self.killers = {}
+        self.history = ({}, {})
+
+        depth = self.search_depth
+        if game.get_player_location(game.active_player) is None:
+            depth = 1
+
+        results = []
+        try:
+            while True:
+                move = self.alphabeta(game, depth, moves=moves)
+                results.append((depth, move, self.root_value, self.solved))
+                if self.pv_ordering:
+                    self.pv = list(self._pv_lines[0])
+                if self.solved:
+                    break
+                depth += 1
+        except SearchTimeout:
+            pass
+        return results
+
+    def parallel_search(self, game, legal_moves, default_move):
+        """
+            Splits the legal moves among the worker processes, starting them
+            if needed, and combines their results at the deepest depth that
+            every worker completed. A worker that solved its moves counts as
+            having completed every depth.
+
+            Parameters
+            ----------
+            game : isolation.Board
+                An instance of the Isolation game `Board` class representing the
+                current game state
+
+            legal_moves : list<(int, int)>
+                The legal moves in the current game state
+
+            default_move : (int, int)
+                The move returned if the workers do not report in time or
+                one of them completes no pass
+
+            Returns
+            -------
+            (int, int)
+                The best move found by the workers.
+        """
+        self.start_workers()
+
+        # Workers stop their own threshold before the deadline they are
+        # sent, so they are sent the point at which this player would stop
+        # searching plus that threshold
+        remaining = (self.time_left() - self.TIMER_THRESHOLD +
+                     self._worker_options["timeout"])
+        deadline = perf_counter_ns() + int(remaining * 1000000)
+        data = game.to_bytes()
+        slot = game.move_count % 2
+        shares = min(self.processes, len(legal_moves))
+        tasks = [(data, slot, legal_moves[i::shares], deadline)
+                 for i in range(shares)]
+        pending = self._pool.map_async(_search_worker_moves, tasks)
+        self._worker_nodes = 0
+        try:
+            results = pending.get(
+                max(self.time_left() - self.TIMER_THRESHOLD / 2, 0) / 1000.)
+        except multiprocessing.TimeoutError:
+            return default_move
+
+        # The moves of a worker that completed no pass cannot be compared
+        # with the others, so the default move stands in for all of them
+        self._worker_nodes = sum(nodes for _, nodes in results)
+        results = [passes for passes, _ in results]
+        if not all(results):
+            return default_move
+        depth = min((passes[-1][0] for passes in results
+                     if not passes[-1][3]), default=None)
+        if depth is None:
+            depth = max(passes[-1][0] for passes in results)
+
+        best_move, best_value = default_move, float("-inf")
+        for passes in results:
+            _, move, value, _ = [p for p in passes if p[0] <= depth][-1]
+            if value > best_value:
+                best_move, best_value = move, value
+        self.depth_completed = depth
+        return best_move
+
+    def start_workers(self):
+        """
+            Starts the worker processes of a parallel search, unless they are
+            running, and waits until every one of them has created its
+            player. With the spawn and forkserver start methods this takes
+            far longer than a turn.
+        """
+        if self._pool is None:
+            ready = multiprocessing.SimpleQueue()
+            self._pool = multiprocessing.Pool(
+                self.processes, _init_search_worker,
+                (self._worker_options, ready))
+            for _ in range(self.processes):
+                ready.get()
+
+    def close(self):
+        """
+            Stops pondering and shuts down the worker processes, if any.
+        """
+        self.stop_pondering()
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def start_pondering(self, game, time_limit):
+        """
+            Starts searching the opponent's replies in the game state in a
+            background thread, with a separate player that shares the
+            transposition table.
+
+            Parameters
+            ----------
+            game : isolation.Board
+                The game state after the player's move
+
+            time_limit : float
+                The number of milliseconds after which pondering stops by
+                itself
+        """
+        if self._ponderer is None:
+            self._ponderer = AlphaBetaPlayer(
+                **dict(self._worker_options, tt_size=None))
+            self._ponderer.tt = self.tt
+        ponderer = self._ponderer
+        players = [game.active_player, game.inactive_player]
+        if game.move_count % 2:
+            players.reverse()
+        players = [ponderer if p is self else p for p in players]
+        board = Board.from_bytes(game.to_bytes(), *players)
+
+        ponderer.time_left = Timer(time_limit)
+        # The replies searched lead to the state of the next call to get_move
+        self.tt.generation = game.move_count + 1
+        # A new thread holds the interpreter lock from its start until it
+        # blocks, which could keep this turn from returning for a whole
+        # switch interval; the search waits for `go` instead, so the thread
+        # only competes for the lock once this call returns
+        go = threading.Event()
+        self._ponder_thread = threading.Thread(
+            target=ponderer.ponder_replies, args=(board, go), daemon=True)
+        self._ponder_thread.start()
+        go.set()
+
+    def stop_pondering(self):
+        """
+            Stops the background search started by `start_pondering`, if any,
+            and waits for it to finish.
+        """
+        if self._ponder_thread is not None:
+            # The search aborts at its next node once the limit has passed
+            self._ponderer._clock_limit = float("-inf")
+            self._ponderer._nodes_to_check = 0
+            self._ponder_thread.join()
+            self._ponder_thread = None
+
+    def ponder_replies(self, game, go=None):
+        """
+            Searches each reply of the opponent in the game state with
+            iterative deepening, starting with the reply the search expects,
+            until all of them are solved or the search times out. The results
+            are left in the transposition table.
+
+            Parameters
+            ----------
+            game : isolation.Board
+                The game state after the player's move
+
+            go : threading.Event (optional)
+                If given, the search starts once it is set
+        """
+        if go is not None:
+            go.wait()
+        self.pv = []
+        replies = game.get_legal_moves()
+        _, expected = self.probe(game, 0, float("-inf"), float("inf"))
+        replies = self.order_moves(replies, None, expected)
+        children = [game.forecast_move(reply) for reply in replies]
+
+        depth = 1
+        try:
+            while children:
+                unsolved = []
+                for child in children:
+                    self.alphabeta(child, depth)
+                    if not self.solved:
+                        unsolved.append(child)
+                children = unsolved
+                depth += 1
+        except SearchTimeout:
+            pass
+
+    def alphabeta(self, game, depth, alpha=float("-inf"), beta=float("inf"),
+                  moves=None):
         """
             Implement depth-limited minimax search with alpha-beta pruning as
             described in the lectures.
@@ -521,6 +1370,9 @@ class AlphaBetaPlayer(IsolationPlayer):
             beta : float
                 Beta limits the upper bound of search on maximizing layers
 
+            moves : list<(int, int)> (optional)
+                If given, only these root moves are searched
+
             Returns
             -------
             (int, int)
@@ -538,29 +1390,211 @@ class AlphaBetaPlayer(IsolationPlayer):
                     each helper function or else your agent will timeout during
                     testing.
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        self._nodes_to_check -= 1
+        if self._nodes_to_check <= 0:
+            self.check_time()
 
         best_value = float('-inf')
         new_alpha = alpha
 
-        best_move = (-1, -1)
+        # Search on a private copy that is mutated in-place with push/pop, so
+        # the caller's board is left untouched even if the search times out
+        game = game.copy()
 
-        for move in game.get_legal_moves():
-            moved_game = game.forecast_move(move)
-            move_score = self.min_value(
-                moved_game, depth - 1, new_alpha, beta)
+        if moves is not None:
+            legal_moves = list(moves)
+        else:
+            legal_moves = game.get_legal_moves()
+            if self.symmetry_pruning:
+                legal_moves = unique_moves(game, legal_moves)
+
+        tt_move = None
+        if self.tt is not None:
+            _, tt_move = self.probe(game, depth, alpha, beta)
+
+        self._root_ply = game.move_count
+        pv_move = None
+        if self.pv_ordering:
+            self._pv_lines = [()] * (depth + 2)
+            pv_move = self.pv[0] if self.pv else None
+
+        legal_moves = self.order_moves(legal_moves, pv_move, tt_move)
+
+        # Every move may lose against best play, and the search must still
+        # return a legal move in that case
+        best_move = legal_moves[0] if legal_moves else (-1, -1)
+        self._horizon_reached = False
+
+        for move in legal_moves:
+            game.push(move)
+            self._follow_pv = pv_move is not None and move == pv_move
+            if self.pvs and move is not legal_moves[0]:
+                move_score = self.min_value(
+                    game, depth - 1, new_alpha, nextafter(new_alpha, beta))
+                if new_alpha < move_score < beta:
+                    move_score = self.min_value(
+                        game, depth - 1, new_alpha, beta)
+            else:
+                move_score = self.min_value(
+                    game, depth - 1, new_alpha, beta)
+            game.pop()
             if move_score > best_value:
                 best_move = move
                 best_value = move_score
+                if self.pv_ordering:
+                    self._pv_lines[0] = (move,) + self._pv_lines[1]
 
             if best_value >= beta:
                 break
 
             new_alpha = max(new_alpha, best_value)
 
+        if self.tt is not None:
+            self.store(game, depth, alpha, beta, best_value, best_move)
+
+        self.root_value = best_value
+        self.solved = (not self._horizon_reached or
+                       best_value in (float('inf'), float('-inf')))
         return best_move
 
+    def order_moves(self, legal_moves, pv_move, tt_move, killers=(),
+                    history=None):
+        """
+            Orders the legal moves of a game state for searching: the move of
+            the previous principal variation first, then the best move
+            stored in the transposition table, then the killer moves, then
+            the rest by decreasing history score.
+
+            Parameters
+            ----------
+            legal_moves : list<(int, int)>
+                The legal moves in the current game state
+
+            pv_move : (int, int) or None
+                The principal variation move for the current game state
+
+            tt_move : (int, int) or None
+                The transposition table move for the current game state
+
+            killers : tuple<(int, int)> (optional)
+                The killer moves for the ply of the current game state
+
+            history : dict (optional)
+                The history scores of the side to move
+
+            Returns
+            -------
+            list<(int, int)>
+                The reordered legal moves.
+        """
+        if history:
+            legal_moves.sort(key=lambda m: history.get(m, 0), reverse=True)
+        for move in killers[::-1] + (tt_move, pv_move):
+            if move is not None and move in legal_moves:
+                legal_moves.remove(move)
+                legal_moves.insert(0, move)
+        return legal_moves
+
+    def pv_move(self, game):
+        """
+            Returns the move of the previous principal variation for the game
+            state, or None if the state is not on the principal variation.
+        """
+        if not self._follow_pv:
+            return None
+        ply = game.move_count - self._root_ply
+        return self.pv[ply] if ply < len(self.pv) else None
+
+    def record_cutoff(self, legal_moves, move, ply, depth, side, killers):
+        """
+            Updates the cutoff counters and the killer and history tables
+            after `move` caused a cutoff.
+
+            Parameters
+            ----------
+            legal_moves : list<(int, int)>
+                The legal moves of the game state in the order searched
+
+            move : (int, int)
+                The move that caused the cutoff
+
+            ply : int
+                The number of plies from the root to the game state
+
+            depth : int
+                The remaining search depth at the game state
+
+            side : int
+                0 if the player is to move in the game state, 1 otherwise
+
+            killers : tuple<(int, int)>
+                The killer moves used to order the game state's moves
+        """
+        self.cutoffs += 1
+        if move == legal_moves[0]:
+            self.first_move_cutoffs += 1
+        history = self.history[side]
+        if move in killers:
+            self.killer_cutoffs += 1
+        elif history.get(move, 0) > 0:
+            self.history_cutoffs += 1
+
+        if self.killer_moves and move not in killers:
+            self.killers[ply] = (move,) + killers[:1]
+        if self.history_heuristic:
+            history[move] = history.get(move, 0) + depth * depth
+
+    def probe(self, game, depth, alpha, beta):
+        """
+            Looks up a game state in the transposition table.
+
+            Parameters
+            ----------
+            game : isolation.Board
+                An instance of the Isolation game `Board` class representing the
+                current game state
+
+            depth : int
+                The number of plies the state is about to be searched to
+
+            alpha : float
+                The minimum score the player is assured of
+
+            beta : float
+                The maximum score the opponent is assured of
+
+            Returns
+            -------
+            (float or None, (int, int) or None)
+                The stored value if it was searched at least `depth` plies
+                and settles the state for the current window (None
+                otherwise), and the stored best move (None if there is none).
+        """
+        entry = self.tt.lookup(game.hash())
+        if entry is None:
+            return None, None
+        self.tt_hits += 1
+        _, entry_depth, flag, value, move, _ = entry
+        if entry_depth >= depth:
+            if (flag == TranspositionTable.EXACT or
+                    (flag == TranspositionTable.LOWER and value >= beta) or
+                    (flag == TranspositionTable.UPPER and value <= alpha)):
+                return value, move
+        return None, move
+
+    def store(self, game, depth, alpha, beta, value, move):
+        """
+            Stores the result of searching a game state with the window
+            (alpha, beta) in the transposition table.
+        """
+        if value <= alpha:
+            flag = TranspositionTable.UPPER
+        elif value >= beta:
+            flag = TranspositionTable.LOWER
+        else:
+            flag = TranspositionTable.EXACT
+        self.tt.store(game.hash(), depth, flag, value, move)
+
     def max_value(self, game, depth, alpha=float("-inf"), beta=float("inf")):
         """
             Calculates the game state's best value from the players perspective.
@@ -586,35 +1620,84 @@ class AlphaBetaPlayer(IsolationPlayer):
             float
                 The game state's best value from the players perspective.
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        self._nodes_to_check -= 1
+        if self._nodes_to_check <= 0:
+            self.check_time()
+
+        ply = game.move_count - self._root_ply
+        if self.pv_ordering:
+            self._pv_lines[ply] = ()
 
         legal_moves = game.get_legal_moves()
 
         # if TERMINAL-TEST(state) then return UTILITY(state)
         if len(legal_moves) == 0 or depth == 0:
+            if legal_moves:
+                self._horizon_reached = True
             return self.score(game, self)
 
+        if self.endgame_solver:
+            value = self.endgame_value(game)
+            if value is not None:
+                return value
+
+        tt_move = None
+        if self.tt is not None:
+            value, tt_move = self.probe(game, depth, alpha, beta)
+            if value is not None:
+                # The stored search may have stopped at its own horizon
+                if value not in (float('inf'), float('-inf')):
+                    self._horizon_reached = True
+                return value
+
+        pv_move = None
+        if self.pv_ordering:
+            pv_move = self.pv_move(game)
+        killers = self.killers.get(ply, ()) if self.killer_moves else ()
+        history = self.history[0] if self.history_heuristic else None
+
+        legal_moves = self.order_moves(
+            legal_moves, pv_move, tt_move, killers, history)
+
         # v ← −∞
         best_value = float('-inf')
+        best_move = legal_moves[0]
 
         new_alpha = alpha
 
         # for each a in ACTIONS(state) do
         for move in legal_moves:
-            moved_game = game.forecast_move(move)
+            game.push(move)
+            if self.pv_ordering:
+                self._follow_pv = pv_move is not None and move == pv_move
 
             # v ← MAX(v, MIN-VALUE(RESULT(state, a), α, β))
-            best_value = max(best_value, self.min_value(
-                moved_game, depth - 1, new_alpha, beta))
+            if self.pvs and move is not legal_moves[0]:
+                # Show with a null window that the move is no better than
+                # the best one so far; search it fully only if it is
+                value = self.min_value(
+                    game, depth - 1, new_alpha, nextafter(new_alpha, beta))
+                if new_alpha < value < beta:
+                    value = self.min_value(game, depth - 1, new_alpha, beta)
+            else:
+                value = self.min_value(game, depth - 1, new_alpha, beta)
+            game.pop()
+            if value > best_value:
+                best_value, best_move = value, move
+                if self.pv_ordering:
+                    self._pv_lines[ply] = (move,) + self._pv_lines[ply + 1]
 
             # if v ≥ β then return v
             if best_value >= beta:
+                self.record_cutoff(legal_moves, move, ply, depth, 0, killers)
                 break
 
             # α ← MAX(α, v)
             new_alpha = max(new_alpha, best_value)
 
+        if self.tt is not None:
+            self.store(game, depth, alpha, beta, best_value, best_move)
+
         # return v
         return best_value
 
@@ -643,32 +1726,307 @@ class AlphaBetaPlayer(IsolationPlayer):
             float
                 The game state's best value from the opponents perspective.
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        self._nodes_to_check -= 1
+        if self._nodes_to_check <= 0:
+            self.check_time()
+
+        ply = game.move_count - self._root_ply
+        if self.pv_ordering:
+            self._pv_lines[ply] = ()
 
         legal_moves = game.get_legal_moves()
 
         # if TERMINAL-TEST(state) then return UTILITY(state)
         if len(legal_moves) == 0 or depth == 0:
+            if legal_moves:
+                self._horizon_reached = True
             return self.score(game, self)
-        
+
+        if self.endgame_solver:
+            value = self.endgame_value(game)
+            if value is not None:
+                return value
+
+        tt_move = None
+        if self.tt is not None:
+            value, tt_move = self.probe(game, depth, alpha, beta)
+            if value is not None:
+                # The stored search may have stopped at its own horizon
+                if value not in (float('inf'), float('-inf')):
+                    self._horizon_reached = True
+                return value
+
+        pv_move = None
+        if self.pv_ordering:
+            pv_move = self.pv_move(game)
+        killers = self.killers.get(ply, ()) if self.killer_moves else ()
+        history = self.history[1] if self.history_heuristic else None
+
+        legal_moves = self.order_moves(
+            legal_moves, pv_move, tt_move, killers, history)
+
         # v ← +∞
         best_value = float('inf')
+        best_move = legal_moves[0]
 
         new_beta = beta
 
         # for each a in ACTIONS(state) do
         for move in legal_moves:
-            moved_game = game.forecast_move(move)
+            game.push(move)
+            if self.pv_ordering:
+                self._follow_pv = pv_move is not None and move == pv_move
+
             # v ← MIN(v, MAX-VALUE(RESULT(state, a), α, β))
-            best_value = min(best_value, self.max_value(
-                moved_game, depth - 1, alpha, new_beta))
+            if self.pvs and move is not legal_moves[0]:
+                # Show with a null window that the move is no better than
+                # the best one so far; search it fully only if it is
+                value = self.max_value(
+                    game, depth - 1, nextafter(new_beta, alpha), new_beta)
+                if alpha < value < new_beta:
+                    value = self.max_value(game, depth - 1, alpha, new_beta)
+            else:
+                value = self.max_value(game, depth - 1, alpha, new_beta)
+            game.pop()
+            if value < best_value:
+                best_value, best_move = value, move
+                if self.pv_ordering:
+                    self._pv_lines[ply] = (move,) + self._pv_lines[ply + 1]
+
             # if v ≤ α then return v
             if best_value <= alpha:
+                self.record_cutoff(legal_moves, move, ply, depth, 1, killers)
                 break
 
             # β ← MIN(β, v)
             new_beta = min(new_beta, best_value)
 
+        if self.tt is not None:
+            self.store(game, depth, alpha, beta, best_value, best_move)
+
         # return v
         return best_value
+
+
+class MCTSNode(object):
+    """
+        A node of the `MCTSPlayer` search tree.
+
+        Parameters
+        ----------
+        key : int
+            The `isolation.Board.hash()` of the node's game state
+
+        move : (int, int) or None
+            The move that led from the parent's state to this one
+
+        untried : list<(int, int)>
+            The legal moves of the state that have no child node yet
+
+        Attributes
+        ----------
+        visits : int
+            The number of playouts that passed through the node.
+
+        wins : int
+            The number of those playouts won by the player who made `move`.
+    """
+    # Nodes keep no reference to their parent, so a discarded subtree holds
+    # no reference cycles and is freed as soon as it is dropped instead of
+    # waiting for a (long) pass of the cyclic garbage collector
+    __slots__ = ('key', 'move', 'children', 'untried', 'visits', 'wins')
+
+    def __init__(self, key, move, untried):
+        self.key = key
+        self.move = move
+        self.children = {}
+        self.untried = untried
+        self.visits = 0
+        self.wins = 0
+
+
+class MCTSPlayer(IsolationPlayer):
+    """
+        Game-playing agent that chooses a move using Monte Carlo tree search
+        with UCT selection and uniformly random playouts, running as many
+        iterations as the time limit allows.
+
+        The subtree of the chosen move is kept between calls to `get_move`,
+        and the node for the opponent's reply becomes the next root, so the
+        playouts of the previous turn keep counting. The rest of the tree
+        is only released at the start of the next call, where freeing it
+        cannot delay the return of a move.
+
+        Parameters
+        ----------
+        exploration : float (optional)
+            The exploration constant of the UCT formula.
+
+        timeout : float (optional)
+            Time remaining (in milliseconds) when search is aborted.
+
+        Attributes
+        ----------
+        iterations : int
+            The number of iterations run by the last call to `get_move`.
+
+        iterations_per_second : float
+            The iteration rate of the last call to `get_move`.
+    """
+
+    def __init__(self, exploration=sqrt(2), timeout=10.):
+        super().__init__(timeout=timeout)
+        self.exploration = exploration
+        self.root = None
+        self._searched_root = None
+        self.iterations = 0
+        self.iterations_per_second = 0.
+
+    def get_move(self, game, time_left):
+        """
+            Search for the best move from the available legal moves and return a
+            result before the time limit expires.
+
+            Parameters
+            ----------
+            game : `isolation.Board`
+                An instance of `isolation.Board` encoding the current state of the
+                game (e.g., player locations and blocked cells).
+
+            time_left : callable
+                A function that returns the number of milliseconds left in the
+                current turn. Returning with any less than 0 ms remaining forfeits
+                the game.
+
+            Returns
+            -------
+            (int, int)
+                The most visited move at the root; (-1, -1) if there are no
+                available legal moves.
+        """
+        self.time_left = time_left
+        start = perf_counter_ns()
+
+        legal_moves = game.get_legal_moves()
+        if not legal_moves:
+            return (-1, -1)
+
+        root = self.find_root(game)
+        self.root = self._searched_root = None
+        game = game.copy()
+        iterations = 0
+        while self._clock() <= self._clock_limit:
+            self.iterate(root, game)
+            iterations += 1
+
+        elapsed = (perf_counter_ns() - start) / 1e9
+        self.iterations = iterations
+        self.iterations_per_second = iterations / elapsed if elapsed else 0.
+
+        self._searched_root = root
+        if not root.children:
+            return legal_moves[0]
+        self.root = max(root.children.values(), key=lambda c: c.visits)
+        return self.root.move
+
+    def find_root(self, game):
+        """
+            Returns the node of the kept subtree for the game state, or a new
+            node if the state is not in the tree.
+        """
+        key = game.hash()
+        if self.root is not None:
+            candidates = [self.root] + list(self.root.children.values())
+            for node in candidates:
+                if node.key == key:
+                    return node
+        return MCTSNode(key, None, game.get_legal_moves())
+
+    def iterate(self, root, game):
+        """
+            Runs one iteration of the search from the root: selects a path
+            with UCT, expands one new node, plays out a random game from it
+            and backs up the result. The game state is restored afterwards.
+
+            Parameters
+            ----------
+            root : MCTSNode
+                The root of the search tree
+
+            game : isolation.Board
+                The game state of the root
+        """
+        node = root
+        path = [root]
+
+        # Selection
+        while not node.untried and node.children:
+            node = self.select_child(node)
+            game.push(node.move)
+            path.append(node)
+
+        # Expansion
+        if node.untried:
+            move = node.untried.pop()
+            game.push(move)
+            node = MCTSNode(game.hash(), move, game.get_legal_moves())
+            path[-1].children[move] = node
+            path.append(node)
+
+        # Playout; the player who cannot move loses
+        mover = game.inactive_player
+        plies = 0
+        moves = game.get_legal_moves()
+        while moves:
+            game.push(random.choice(moves))
+            plies += 1
+            moves = game.get_legal_moves()
+        result = int(game.active_player != mover)
+        for _ in range(plies + len(path) - 1):
+            game.pop()
+
+        # Backpropagation along the selected path, from the new node up
+        for node in reversed(path):
+            node.visits += 1
+            node.wins += result
+            result = 1 - result
+
+    def select_child(self, node):
+        """
+            Returns the child of the node with the highest UCT value.
+        """
+        log_visits = log(node.visits)
+        exploration = self.exploration
+        return max(node.children.values(),
+                   key=lambda c: (c.wins / c.visits +
+                                  exploration * sqrt(log_visits / c.visits)))
+
+
+# The player used by a worker process of a parallel `AlphaBetaPlayer` search
+_worker_player = None
+
+
+def _init_search_worker(options, ready):
+    """Create the player of a worker process and report it on the `ready`
+    queue.
+    """
+    global _worker_player
+    _worker_player = AlphaBetaPlayer(**options)
+    ready.put(True)
+
+
+def _search_worker_moves(task):
+    """Run `AlphaBetaPlayer.search_moves` in a worker process for a task of
+    the form `(board_bytes, slot, moves, deadline)`, where `slot` is 0 if the
+    searching player is the first player of the board and `deadline` is a
+    `perf_counter_ns()` value, and return its results with the number of
+    nodes searched.
+    """
+    data, slot, moves, deadline = task
+    players = [_worker_player, "opponent"]
+    if slot:
+        players.reverse()
+    game = Board.from_bytes(data, *players)
+    time_left = Timer((deadline - perf_counter_ns()) / 1000000.)
+    passes = _worker_player.search_moves(game, moves, time_left)
+    return passes, _worker_player.nodes_searched()
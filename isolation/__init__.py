@@ -8,4 +8,10 @@ legal moves loses, and the opponent is declared the winner.
 """
 
 # Make the Board class available at the root of the module for imports
-from .isolation import Board
+from .isolation import Board, MoveRecord, Timer
+
+# BoardBatch needs NumPy, which is optional for playing games with Board
+try:
+    from .batch import BoardBatch
+except ImportError:
+    pass
@@ -0,0 +1,188 @@
+"""
+This file contains the `BoardBatch` class, which stores many Isolation
+positions as NumPy arrays so that mobility features (legal move counts,
+look-ahead mobility and occupancy) can be computed for all of them with a
+handful of vectorized operations instead of one `Board` at a time.
+"""
+import numpy as np
+
+from .isolation import knight_neighbors
+
+# Knight-move adjacency matrices for each board size seen so far, keyed by
+# (width, height)
+_ADJACENCY = {}
+
+
+def knight_adjacency(width, height):
+    """Return the boolean knight-move adjacency matrix of a board of the given
+    size; entry ``[i, j]`` is True when cell ``j`` is one knight move away
+    from cell ``i`` (cells are indexed ``row + column * height``).
+    """
+    adjacency = _ADJACENCY.get((width, height))
+    if adjacency is None:
+        size = width * height
+        adjacency = np.zeros((size, size), dtype=bool)
+        for idx, neighbors in enumerate(knight_neighbors(width, height)):
+            adjacency[idx, [j for j, _ in neighbors]] = True
+        _ADJACENCY[(width, height)] = adjacency
+    return adjacency
+
+
+def _unpack_mask(mask, size):
+    """Convert a blocked-cell bitmask into a boolean vector of length `size`.
+    """
+    data = np.frombuffer(mask.to_bytes((size + 7) // 8, "little"), np.uint8)
+    return np.unpackbits(data, bitorder="little")[:size].astype(bool)
+
+
+class BoardBatch(object):
+    """A batch of N Isolation positions on boards of the same size between
+    the same two players.
+
+    Parameters
+    ----------
+    player_1 : object
+        The object registered as the first player in every position.
+
+    player_2 : object
+        The object registered as the second player in every position.
+
+    blocked : numpy.ndarray
+        Boolean array of shape (N, width * height); entry ``[n, idx]`` is True
+        when cell ``idx`` is blocked in position ``n``.
+
+    locations : numpy.ndarray
+        Integer array of shape (N, 2) holding the cell index of player 1 and
+        player 2 in each position, or -1 if that player has not moved yet.
+
+    active : numpy.ndarray
+        Integer array of shape (N,) holding 0 where player 1 has the
+        initiative and 1 where player 2 has it.
+
+    width : int (optional)
+        The number of columns of the boards.
+
+    height : int (optional)
+        The number of rows of the boards.
+    """
+
+    def __init__(self, player_1, player_2, blocked, locations, active,
+                 width=7, height=7):
+        self.player_1 = player_1
+        self.player_2 = player_2
+        self.blocked = blocked
+        self.locations = locations
+        self.active = active
+        self.width = width
+        self.height = height
+        self._adjacency = knight_adjacency(width, height)
+
+    def __len__(self):
+        return len(self.active)
+
+    @classmethod
+    def from_boards(cls, boards):
+        """Build a batch from a non-empty sequence of `isolation.Board`
+        objects that share their players and board size.
+        """
+        first = boards[0]
+        player_1, player_2 = first.active_player, first.inactive_player
+        if first.move_count % 2:
+            player_1, player_2 = player_2, player_1
+        size = first.width * first.height
+
+        blocked = np.empty((len(boards), size), dtype=bool)
+        locations = np.empty((len(boards), 2), dtype=np.intp)
+        active = np.empty(len(boards), dtype=np.intp)
+        for n, board in enumerate(boards):
+            blocked[n] = _unpack_mask(board.blocked, size)
+            for side, player in enumerate((player_1, player_2)):
+                loc = board.get_player_location(player)
+                locations[n, side] = -1 if loc is None else loc[0] + loc[1] * board.height
+            active[n] = int(board.active_player == player_2)
+        return cls(player_1, player_2, blocked, locations, active,
+                   width=first.width, height=first.height)
+
+    @classmethod
+    def from_children(cls, game, moves):
+        """Build a batch holding the positions that result from applying each
+        of the specified moves to `game`, i.e., one level of the search
+        frontier below `game`.
+        """
+        player_1, player_2 = game.active_player, game.inactive_player
+        if game.move_count % 2:
+            player_1, player_2 = player_2, player_1
+        size = game.width * game.height
+        mover = int(game.active_player == player_2)
+
+        idxs = np.array([r + c * game.height for r, c in moves], dtype=np.intp)
+        blocked = np.repeat(_unpack_mask(game.blocked, size)[np.newaxis], len(idxs), axis=0)
+        blocked[np.arange(len(idxs)), idxs] = True
+
+        locations = np.empty((len(idxs), 2), dtype=np.intp)
+        for side, player in enumerate((player_1, player_2)):
+            loc = game.get_player_location(player)
+            locations[:, side] = -1 if loc is None else loc[0] + loc[1] * game.height
+        locations[:, mover] = idxs
+
+        active = np.full(len(idxs), 1 - mover, dtype=np.intp)
+        return cls(player_1, player_2, blocked, locations, active,
+                   width=game.width, height=game.height)
+
+    def side(self, player):
+        """Return 0 if the specified player is player 1 of the batch and 1 if
+        it is player 2.
+        """
+        if player == self.player_1:
+            return 0
+        elif player == self.player_2:
+            return 1
+        raise RuntimeError("`player` must be an object registered as a player in the batch.")
+
+    def legal_moves(self, side):
+        """Return a boolean array of shape (N, width * height) marking the
+        legal moves of player 1 (side 0) or player 2 (side 1) in each
+        position.
+        """
+        return self._moves_from(self.locations[:, side])
+
+    def legal_move_counts(self, side):
+        """Return the number of legal moves of the given side in each position.
+        """
+        return self.legal_moves(side).sum(axis=1)
+
+    def look_ahead_counts(self, moves):
+        """Return, for a boolean move array as returned by legal_moves(), how
+        many times each open cell can be reached with one more knight move,
+        as an integer array of shape (N, width * height).
+        """
+        counts = moves.astype(np.intp) @ self._adjacency
+        counts[self.blocked] = 0
+        return counts
+
+    def occupancy(self):
+        """Return the fraction of blocked cells in each position. """
+        return self.blocked.sum(axis=1) / float(self.blocked.shape[1])
+
+    def terminal_values(self, player):
+        """Return the utility of each position for the specified player:
+        +inf where it has won, -inf where it has lost and 0 otherwise.
+        """
+        side = self.side(player)
+        active_locations = self.locations[np.arange(len(self)), self.active]
+        stuck = ~self._moves_from(active_locations).any(axis=1)
+        values = np.zeros(len(self), dtype=float)
+        values[stuck & (self.active == side)] = float("-inf")
+        values[stuck & (self.active != side)] = float("inf")
+        return values
+
+    def _moves_from(self, locations):
+        """Return the boolean legal move array for pieces standing on the
+        given cell index (or -1 for a piece that has not moved) in each
+        position.
+        """
+        open_cells = ~self.blocked
+        moves = self._adjacency[np.maximum(locations, 0)] & open_cells
+        not_moved = locations < 0
+        moves[not_moved] = open_cells[not_moved]
+        return moves
@@ -8,11 +8,228 @@ remain compatible with the defaults provided, and none of your changes will
 be available to project reviewers.
 """
 import random
-import timeit
-from copy import copy
+from collections import namedtuple
+from time import perf_counter_ns
 
 TIME_LIMIT_MILLIS = 150
 
+# (row, column) offsets of the eight L-shaped knight moves
+DIRECTIONS = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
+              (1, -2), (1, 2), (2, -1), (2, 1)]
+
+# Knight-move masks and neighbor lists for each board size seen so far, keyed
+# by (width, height)
+_KNIGHT_MASKS = {}
+_KNIGHT_NEIGHBORS = {}
+
+# (row, column) coordinates of every cell index for each board size seen so
+# far, keyed by (width, height)
+_COORDINATES = {}
+
+# Cell permutations of the board symmetries for each board size seen so far,
+# keyed by (width, height)
+_SYMMETRIES = {}
+
+# Memoized longest knight paths for each board size seen so far, keyed by
+# (width, height); each table maps (cell index, open cells) to a path length
+_LONGEST_PATHS = {}
+_LONGEST_PATHS_LIMIT = 1 << 20
+
+# Zobrist keys for each board size seen so far, keyed by (width, height)
+_ZOBRIST_KEYS = {}
+_ZOBRIST_SEED = 0x15014710
+
+
+def knight_masks(width, height):
+    """Return the knight-move bitmask of every cell on a board of the given
+    size.
+
+    Cells are indexed column-major (``idx = row + column * height``), and bit
+    ``j`` of ``knight_masks(width, height)[idx]`` is set when cell ``j`` is
+    one knight move away from cell ``idx``. The masks are computed once per
+    board size and shared by every board of that size.
+    """
+    masks = _KNIGHT_MASKS.get((width, height))
+    if masks is None:
+        masks = []
+        for idx in range(width * height):
+            c, r = divmod(idx, height)
+            mask = 0
+            for dr, dc in DIRECTIONS:
+                if 0 <= r + dr < height and 0 <= c + dc < width:
+                    mask |= 1 << (r + dr + (c + dc) * height)
+            masks.append(mask)
+        _KNIGHT_MASKS[(width, height)] = masks
+    return masks
+
+
+def knight_neighbors(width, height):
+    """Return the in-bounds knight-move neighbors of every cell on a board of
+    the given size.
+
+    Entry ``idx`` of the result is a tuple of ``(index, (row, column))``
+    pairs, one for each cell a knight standing on cell ``idx`` could reach
+    on an empty board, so move generation only has to filter the list
+    against the blocked cells. The lists are computed once per board size.
+    """
+    neighbors = _KNIGHT_NEIGHBORS.get((width, height))
+    if neighbors is None:
+        neighbors = []
+        for idx in range(width * height):
+            c, r = divmod(idx, height)
+            neighbors.append(tuple(
+                (r + dr + (c + dc) * height, (r + dr, c + dc))
+                for dr, dc in DIRECTIONS
+                if 0 <= r + dr < height and 0 <= c + dc < width))
+        _KNIGHT_NEIGHBORS[(width, height)] = neighbors
+    return neighbors
+
+
+def cell_coordinates(width, height):
+    """Return the (row, column) coordinates of every cell index on a board of
+    the given size, computed once per board size.
+    """
+    coordinates = _COORDINATES.get((width, height))
+    if coordinates is None:
+        coordinates = [(idx % height, idx // height)
+                       for idx in range(width * height)]
+        _COORDINATES[(width, height)] = coordinates
+    return coordinates
+
+
+def zobrist_keys(width, height):
+    """Return the 64-bit Zobrist keys for a board of the given size.
+
+    The result is a tuple ``(cells, player_1, player_2, side)`` where
+    ``cells[idx]`` is XORed into a position key while cell ``idx`` is
+    blocked, ``player_1[idx]`` and ``player_2[idx]`` while the respective
+    player stands on cell ``idx``, and ``side`` while player 2 has the
+    initiative. The keys come from a fixed seed, so every process derives
+    the same keys for the same board size.
+    """
+    keys = _ZOBRIST_KEYS.get((width, height))
+    if keys is None:
+        rng = random.Random(_ZOBRIST_SEED ^ (width << 16) ^ height)
+        size = width * height
+        keys = (tuple(rng.getrandbits(64) for _ in range(size)),
+                tuple(rng.getrandbits(64) for _ in range(size)),
+                tuple(rng.getrandbits(64) for _ in range(size)),
+                rng.getrandbits(64))
+        _ZOBRIST_KEYS[(width, height)] = keys
+    return keys
+
+
+def symmetries(width, height):
+    """Return the cell permutations of the symmetries of a board of the given
+    size.
+
+    Each permutation maps a cell index to the index of its image, so
+    ``perm[idx]`` is where cell ``idx`` lands. Every board has the identity,
+    both mirror images and the half turn; square boards also have the two
+    quarter turns and the two diagonal reflections. All of them map knight
+    moves onto knight moves, so they preserve the value of a position.
+    """
+    perms = _SYMMETRIES.get((width, height))
+    if perms is None:
+        h, w = height - 1, width - 1
+        transforms = [lambda r, c: (r, c),
+                      lambda r, c: (h - r, c),
+                      lambda r, c: (r, w - c),
+                      lambda r, c: (h - r, w - c)]
+        if width == height:
+            transforms += [lambda r, c: (c, r),
+                           lambda r, c: (w - c, h - r),
+                           lambda r, c: (c, h - r),
+                           lambda r, c: (w - c, r)]
+        perms = []
+        for transform in transforms:
+            perm = []
+            for idx in range(width * height):
+                r, c = transform(idx % height, idx // height)
+                perm.append(r + c * height)
+            perms.append(tuple(perm))
+        _SYMMETRIES[(width, height)] = perms
+    return perms
+
+
+def longest_path(width, height, idx, open_cells, tick=None):
+    """Return the number of moves in the longest knight path that starts on
+    cell `idx` and visits each cell of the `open_cells` bitmask at most once.
+
+    This is the exact number of moves left to a player that can no longer
+    interact with its opponent. The search is exponential in the number of
+    open cells, so callers should restrict `open_cells` to the player's
+    reachable region and only solve small regions. Results are memoized per
+    board size. If given, `tick` is called without arguments for every
+    state that is not memoized yet, so that a caller can bound the work
+    (e.g., by raising an exception); the states solved until then stay
+    memoized.
+    """
+    memo = _LONGEST_PATHS.get((width, height))
+    if memo is None or len(memo) > _LONGEST_PATHS_LIMIT:
+        memo = _LONGEST_PATHS[(width, height)] = {}
+    return _longest_path(knight_masks(width, height), memo, idx, open_cells,
+                         tick)
+
+
+def _longest_path(masks, memo, idx, open_cells, tick):
+    """Depth-first helper of `longest_path()`. """
+    key = (idx, open_cells)
+    length = memo.get(key)
+    if length is None:
+        if tick is not None:
+            tick()
+        length = 0
+        upper_bound = bin(open_cells).count("1")
+        free = masks[idx] & open_cells
+        while free and length < upper_bound:
+            bit = free & -free
+            free ^= bit
+            length = max(length, 1 + _longest_path(
+                masks, memo, bit.bit_length() - 1, open_cells ^ bit, tick))
+        memo[key] = length
+    return length
+
+
+# One record per ply yielded by Board.iter_play(); `winner` and `termination`
+# are None until the final record, which describes the losing turn
+MoveRecord = namedtuple("MoveRecord", ["ply", "player", "move", "time_used",
+                                       "time_left", "legal_move_count",
+                                       "winner", "termination"])
+
+
+class Timer(object):
+    """Countdown timer for one turn that can be passed to an agent in place of
+    a `time_left` function.
+
+    Calling the timer returns the number of milliseconds left, exactly like
+    the `time_left` functions agents have always received. Search code can
+    instead compare `time.perf_counter_ns()` against the precomputed
+    `deadline` (in integer nanoseconds), or call expired(), which avoids the
+    float conversion on every check.
+
+    Parameters
+    ----------
+    time_limit : numeric
+        The number of milliseconds until the timer expires.
+    """
+    __slots__ = ('start', 'deadline')
+
+    def __init__(self, time_limit):
+        self.start = perf_counter_ns()
+        self.deadline = self.start + int(time_limit * 1000000)
+
+    def __call__(self):
+        return (self.deadline - perf_counter_ns()) / 1000000.
+
+    def elapsed(self):
+        """Return the number of milliseconds since the timer was started. """
+        return (perf_counter_ns() - self.start) / 1000000.
+
+    def expired(self, margin=0):
+        """Test whether fewer than `margin` milliseconds are left. """
+        return perf_counter_ns() > self.deadline - int(margin * 1000000)
+
 
 class Board(object):
     """Implement a model for the game Isolation assuming each player moves like
@@ -33,11 +250,29 @@ class Board(object):
 
     height : int (optional)
         The number of rows that the board should have.
+
+    shuffle : bool (optional)
+        If True (the default), the lists returned by get_legal_moves() are
+        shuffled; otherwise the moves are returned in a stable order, so
+        that search code can impose its own move ordering.
+
+    seed : hashable (optional)
+        Seed for a random number generator owned by the board (and shared by
+        its copies) that is used for shuffling moves. If None, the global
+        `random` module is used.
     """
     BLANK = 0
     NOT_MOVED = None
 
-    def __init__(self, player_1, player_2, width=7, height=7):
+    # Boards are created by the million during search, so they carry no
+    # per-instance __dict__; the per-size tables are shared references
+    __slots__ = ('width', 'height', 'move_count', '_player_1', '_player_2',
+                 '_active_player', '_inactive_player', '_blocked', '_full',
+                 '_p1_loc', '_p2_loc', '_masks', '_neighbors', '_zobrist',
+                 '_hash', '_undo', '_rng', '_p1_moves', '_p2_moves')
+
+    def __init__(self, player_1, player_2, width=7, height=7, shuffle=True,
+                 seed=None):
         self.width = width
         self.height = height
         self.move_count = 0
@@ -46,14 +281,50 @@ class Board(object):
         self._active_player = player_1
         self._inactive_player = player_2
 
-        # The last 3 entries of the board state includes initiative (0 for
-        # player 1, 1 for player 2) player 2 last move, and player 1 last move
-        self._board_state = [Board.BLANK] * (width * height + 3)
-        self._board_state[-1] = Board.NOT_MOVED
-        self._board_state[-2] = Board.NOT_MOVED
+        # Bit `idx` of the blocked mask is set once a player has occupied the
+        # cell at index `idx = row + column * height`; the player locations
+        # are stored as cell indices (or NOT_MOVED before the first move)
+        self._blocked = 0
+        self._full = (1 << (width * height)) - 1
+        self._p1_loc = Board.NOT_MOVED
+        self._p2_loc = Board.NOT_MOVED
+        self._masks = knight_masks(width, height)
+        self._neighbors = knight_neighbors(width, height)
+
+        # Zobrist key of the current state, updated incrementally by
+        # apply_move() and pop(); the empty board with player 1 to move is 0
+        self._zobrist = zobrist_keys(width, height)
+        self._hash = 0
+
+        # Previous locations of the players moved by push(), restored by pop()
+        self._undo = []
+
+        # Legal moves of each player in the current state, generated on first
+        # request and discarded whenever the state changes
+        self._p1_moves = None
+        self._p2_moves = None
+
+        # Shuffles legal move lists; None returns moves in a stable order
+        if not shuffle:
+            self._rng = None
+        elif seed is None:
+            self._rng = random
+        else:
+            self._rng = random.Random(seed)
 
     def hash(self):
-        return str(self._board_state).__hash__()
+        """Return a 64-bit Zobrist key of the current state. The key covers
+        the blocked cells, both player locations and which player holds the
+        initiative, and is maintained incrementally as moves are applied.
+        """
+        return self._hash
+
+    @property
+    def blocked(self):
+        """Bitmask of the blocked cells in the current game state; bit
+        `row + column * height` is set once that cell has been occupied.
+        """
+        return self._blocked
 
     @property
     def active_player(self):
@@ -92,11 +363,26 @@ class Board(object):
 
     def copy(self):
         """ Return a deep copy of the current board. """
-        new_board = Board(self._player_1, self._player_2, width=self.width, height=self.height)
+        new_board = Board.__new__(Board)
+        new_board.width = self.width
+        new_board.height = self.height
         new_board.move_count = self.move_count
+        new_board._player_1 = self._player_1
+        new_board._player_2 = self._player_2
         new_board._active_player = self._active_player
         new_board._inactive_player = self._inactive_player
-        new_board._board_state = copy(self._board_state)
+        new_board._blocked = self._blocked
+        new_board._full = self._full
+        new_board._p1_loc = self._p1_loc
+        new_board._p2_loc = self._p2_loc
+        new_board._masks = self._masks
+        new_board._neighbors = self._neighbors
+        new_board._zobrist = self._zobrist
+        new_board._hash = self._hash
+        new_board._undo = []
+        new_board._rng = self._rng
+        new_board._p1_moves = self._p1_moves
+        new_board._p2_moves = self._p2_moves
         return new_board
 
     def forecast_move(self, move):
@@ -118,6 +404,145 @@ class Board(object):
         new_board.apply_move(move)
         return new_board
 
+    def reachable_cells(self, player):
+        """Return the bitmask of open cells that the specified player could
+        still reach through any sequence of knight moves over open cells
+        (a flood fill of the knight graph, ignoring the opponent's moves).
+        """
+        idx = self.__location_index(player)
+        if idx == Board.NOT_MOVED:
+            return self._full & ~self._blocked
+        masks = self._masks
+        open_cells = ~self._blocked
+        reached = 0
+        frontier = masks[idx] & open_cells
+        while frontier:
+            reached |= frontier
+            frontier = self.__expand(frontier) & open_cells & ~reached
+        return reached
+
+    def is_partitioned(self):
+        """Test whether the players have been separated, i.e., no open cell
+        can be reached by both of them, so that each one is left with a
+        single-player longest path problem.
+        """
+        if self._p1_loc == Board.NOT_MOVED or self._p2_loc == Board.NOT_MOVED:
+            return False
+        open_cells = ~self._blocked
+        # Grow both regions one layer at a time; they are separated as soon
+        # as either one is closed without the two touching
+        reached_1 = frontier_1 = self._masks[self._p1_loc] & open_cells
+        reached_2 = frontier_2 = self._masks[self._p2_loc] & open_cells
+        while True:
+            if reached_1 & reached_2:
+                return False
+            if not frontier_1 or not frontier_2:
+                return True
+            frontier_1 = self.__expand(frontier_1) & open_cells & ~reached_1
+            frontier_2 = self.__expand(frontier_2) & open_cells & ~reached_2
+            reached_1 |= frontier_1
+            reached_2 |= frontier_2
+
+    def longest_path(self, player, tick=None):
+        """Return the exact number of moves the specified player can still
+        make if the opponent never gets in its way (see `longest_path()`,
+        which calls `tick` for every new state it solves).
+        """
+        idx = self.__location_index(player)
+        if idx == Board.NOT_MOVED:
+            raise RuntimeError("`player` must have been placed on the board.")
+        return longest_path(self.width, self.height, idx,
+                            self.reachable_cells(player), tick)
+
+    def canonical_key(self):
+        """Return a key that is identical for all positions that are mirror
+        images or rotations of each other (see `symmetries()`), so
+        symmetric positions can share transposition table entries and
+        symmetric moves can be searched only once.
+
+        Returns
+        -------
+        tuple
+            The smallest `(blocked, player 1 index, player 2 index, player 2
+            to move)` tuple over the images of the current state, with -1
+            for a player that has not moved.
+        """
+        return min(self.__images())[0]
+
+    def canonical(self):
+        """Return a copy of the current game transformed into the orientation
+        whose `canonical_key()` is smallest.
+        """
+        _, perm = min(self.__images())
+        new_board = self.copy()
+        p1_loc = self._p1_loc if self._p1_loc == Board.NOT_MOVED else perm[self._p1_loc]
+        p2_loc = self._p2_loc if self._p2_loc == Board.NOT_MOVED else perm[self._p2_loc]
+        new_board._p1_loc = p1_loc
+        new_board._p2_loc = p2_loc
+        new_board._blocked = self.__permuted_blocked(perm)
+        new_board._p1_moves = new_board._p2_moves = None
+        new_board._hash = new_board.__full_hash()
+        return new_board
+
+    def to_int(self):
+        """Pack the current game state into a single non-negative integer.
+
+        From the least significant bit up, the integer holds the blocked
+        mask (`width * height` bits), the locations of player 1 and player 2
+        (each stored as index + 1, so 0 means not moved) and a final bit
+        that is set when player 2 holds the initiative. The board size and
+        the player objects are not included; see `from_int()`.
+        """
+        size = self.width * self.height
+        bits = size.bit_length()
+        p1_loc = 0 if self._p1_loc == Board.NOT_MOVED else self._p1_loc + 1
+        p2_loc = 0 if self._p2_loc == Board.NOT_MOVED else self._p2_loc + 1
+        side = int(self._active_player == self._player_2)
+        return (self._blocked | p1_loc << size | p2_loc << (size + bits) |
+                side << (size + 2 * bits))
+
+    @classmethod
+    def from_int(cls, value, player_1, player_2, width=7, height=7,
+                 shuffle=True, seed=None):
+        """Return a new board between the specified players holding the game
+        state packed by `to_int()` for a board of the given size.
+        """
+        board = cls(player_1, player_2, width=width, height=height,
+                    shuffle=shuffle, seed=seed)
+        size = width * height
+        bits = size.bit_length()
+        field = (1 << bits) - 1
+        board._blocked = value & board._full
+        p1_loc = (value >> size & field) - 1
+        p2_loc = (value >> (size + bits) & field) - 1
+        board._p1_loc = Board.NOT_MOVED if p1_loc < 0 else p1_loc
+        board._p2_loc = Board.NOT_MOVED if p2_loc < 0 else p2_loc
+        # Every move blocks exactly one cell
+        board.move_count = bin(board._blocked).count("1")
+        if value >> (size + 2 * bits) & 1:
+            board._active_player, board._inactive_player = player_2, player_1
+        board._hash = board.__full_hash()
+        return board
+
+    def to_bytes(self):
+        """Serialize the current game state, including the board size, into a
+        compact `bytes` object (two header bytes holding the width and the
+        height, followed by `to_int()` in little-endian byte order).
+        """
+        size = self.width * self.height
+        length = (size + 2 * size.bit_length() + 8) // 8
+        return (bytes((self.width, self.height)) +
+                self.to_int().to_bytes(length, "little"))
+
+    @classmethod
+    def from_bytes(cls, data, player_1, player_2, shuffle=True, seed=None):
+        """Return a new board between the specified players holding the game
+        state serialized by `to_bytes()`.
+        """
+        return cls.from_int(int.from_bytes(data[2:], "little"), player_1,
+                            player_2, width=data[0], height=data[1],
+                            shuffle=shuffle, seed=seed)
+
     def move_is_legal(self, move):
         """Test whether a move is legal in the current game state.
 
@@ -132,15 +557,24 @@ class Board(object):
         bool
             Returns True if the move is legal, False otherwise
         """
-        idx = move[0] + move[1] * self.height
         return (0 <= move[0] < self.height and 0 <= move[1] < self.width and
-                self._board_state[idx] == Board.BLANK)
+                not self._blocked >> (move[0] + move[1] * self.height) & 1)
 
     def get_blank_spaces(self):
         """Return a list of the locations that are still available on the board.
         """
-        return [(i, j) for j in range(self.width) for i in range(self.height)
-                if self._board_state[i + j * self.height] == Board.BLANK]
+        # One pass over the binary digits of the blocked mask (least
+        # significant first) instead of one shift per cell, so the cost stays
+        # linear in the board area on large boards
+        coordinates = cell_coordinates(self.width, self.height)
+        cells = format(self._blocked, "b").zfill(len(coordinates))[::-1]
+        return [coordinates[idx] for idx, bit in enumerate(cells) if bit == "0"]
+
+    def count_blank_spaces(self):
+        """Return the number of locations that are still available on the
+        board.
+        """
+        return self.width * self.height - bin(self._blocked).count("1")
 
     def get_player_location(self, player):
         """Find the current location of the specified player on the board.
@@ -156,17 +590,9 @@ class Board(object):
             The coordinate pair (row, column) of the input player, or None
             if the player has not moved.
         """
-        if player == self._player_1:
-            if self._board_state[-1] == Board.NOT_MOVED:
-                return Board.NOT_MOVED
-            idx = self._board_state[-1]
-        elif player == self._player_2:
-            if self._board_state[-2] == Board.NOT_MOVED:
-                return Board.NOT_MOVED
-            idx = self._board_state[-2]
-        else:
-            raise RuntimeError(
-                "Invalid player in get_player_location: {}".format(player))
+        idx = self.__location_index(player)
+        if idx == Board.NOT_MOVED:
+            return Board.NOT_MOVED
         w = idx // self.height
         h = idx % self.height
         return (h, w)
@@ -187,8 +613,19 @@ class Board(object):
             for the player constrained by the current game state.
         """
         if player is None:
-            player = self.active_player
-        return self.__get_moves(self.get_player_location(player))
+            player = self._active_player
+        if player == self._player_1:
+            moves = self._p1_moves
+            if moves is None:
+                moves = self._p1_moves = tuple(self.__get_moves(self._p1_loc))
+        elif player == self._player_2:
+            moves = self._p2_moves
+            if moves is None:
+                moves = self._p2_moves = tuple(self.__get_moves(self._p2_loc))
+        else:
+            raise RuntimeError(
+                "Invalid player in get_player_location: {}".format(player))
+        return list(moves)
 
     def apply_move(self, move):
         """Move the active player to a specified location.
@@ -200,20 +637,76 @@ class Board(object):
             the active player on the board.
         """
         idx = move[0] + move[1] * self.height
-        last_move_idx = int(self.active_player == self._player_2) + 1
-        self._board_state[-last_move_idx] = idx
-        self._board_state[idx] = 1
-        self._board_state[-3] ^= 1
+        cell_keys, p1_keys, p2_keys, side_key = self._zobrist
+        key = self._hash ^ cell_keys[idx] ^ side_key
+        if self._active_player == self._player_2:
+            if self._p2_loc != Board.NOT_MOVED:
+                key ^= p2_keys[self._p2_loc]
+            self._p2_loc = idx
+            key ^= p2_keys[idx]
+        else:
+            if self._p1_loc != Board.NOT_MOVED:
+                key ^= p1_keys[self._p1_loc]
+            self._p1_loc = idx
+            key ^= p1_keys[idx]
+        self._hash = key
+        self._blocked |= 1 << idx
+        self._p1_moves = self._p2_moves = None
         self._active_player, self._inactive_player = self._inactive_player, self._active_player
         self.move_count += 1
 
+    def push(self, move):
+        """Apply a move in-place like apply_move(), and remember enough of the
+        current state that pop() can restore it exactly.
+
+        This is the make/unmake counterpart of forecast_move() for search
+        code that walks the game tree on a single board instead of copying
+        it at every node.
+
+        Parameters
+        ----------
+        move : (int, int)
+            A legal coordinate pair (row, column) indicating the next position
+            for the active player on the board.
+        """
+        if self._active_player == self._player_2:
+            self._undo.append(self._p2_loc)
+        else:
+            self._undo.append(self._p1_loc)
+        self.apply_move(move)
+
+    def pop(self):
+        """Undo the most recent move applied with push().
+
+        Returns
+        -------
+        (int, int)
+            The coordinate pair (row, column) of the move that was undone.
+        """
+        prev_loc = self._undo.pop()
+        self._active_player, self._inactive_player = self._inactive_player, self._active_player
+        self.move_count -= 1
+        if self._active_player == self._player_2:
+            idx, self._p2_loc = self._p2_loc, prev_loc
+            loc_keys = self._zobrist[2]
+        else:
+            idx, self._p1_loc = self._p1_loc, prev_loc
+            loc_keys = self._zobrist[1]
+        key = self._hash ^ self._zobrist[0][idx] ^ self._zobrist[3] ^ loc_keys[idx]
+        if prev_loc != Board.NOT_MOVED:
+            key ^= loc_keys[prev_loc]
+        self._hash = key
+        self._blocked &= ~(1 << idx)
+        self._p1_moves = self._p2_moves = None
+        return (idx % self.height, idx // self.height)
+
     def is_winner(self, player):
         """ Test whether the specified player has won the game. """
-        return player == self._inactive_player and not self.get_legal_moves(self._active_player)
+        return player == self._inactive_player and not self.__has_moves(self._active_player)
 
     def is_loser(self, player):
         """ Test whether the specified player has lost the game. """
-        return player == self._active_player and not self.get_legal_moves(self._active_player)
+        return player == self._active_player and not self.__has_moves(self._active_player)
 
     def utility(self, player):
         """Returns the utility of the current game state from the perspective
@@ -237,7 +730,7 @@ class Board(object):
             a value of -inf if the player has lost, and a value of 0
             otherwise.
         """
-        if not self.get_legal_moves(self._active_player):
+        if not self.__has_moves(self._active_player):
 
             if player == self._inactive_player:
                 return float("inf")
@@ -247,19 +740,91 @@ class Board(object):
 
         return 0.
 
-    def __get_moves(self, loc):
+    def __full_hash(self):
+        """Compute the Zobrist key of the current state from scratch. """
+        cell_keys, p1_keys, p2_keys, side_key = self._zobrist
+        key = side_key if self._active_player == self._player_2 else 0
+        mask = self._blocked
+        while mask:
+            bit = mask & -mask
+            key ^= cell_keys[bit.bit_length() - 1]
+            mask ^= bit
+        if self._p1_loc != Board.NOT_MOVED:
+            key ^= p1_keys[self._p1_loc]
+        if self._p2_loc != Board.NOT_MOVED:
+            key ^= p2_keys[self._p2_loc]
+        return key
+
+    def __expand(self, cells):
+        """Return the union of the knight-move masks of the given cells. """
+        masks = self._masks
+        expanded = 0
+        while cells:
+            bit = cells & -cells
+            expanded |= masks[bit.bit_length() - 1]
+            cells ^= bit
+        return expanded
+
+    def __permuted_blocked(self, perm):
+        """Return the blocked mask with every cell moved to its image under
+        the cell permutation `perm`.
+        """
+        blocked = 0
+        mask = self._blocked
+        while mask:
+            bit = mask & -mask
+            blocked |= 1 << perm[bit.bit_length() - 1]
+            mask ^= bit
+        return blocked
+
+    def __images(self):
+        """Generate a `(key, perm)` pair for the image of the current state
+        under each board symmetry.
+        """
+        side = int(self._active_player == self._player_2)
+        for perm in symmetries(self.width, self.height):
+            p1_loc = -1 if self._p1_loc == Board.NOT_MOVED else perm[self._p1_loc]
+            p2_loc = -1 if self._p2_loc == Board.NOT_MOVED else perm[self._p2_loc]
+            yield (self.__permuted_blocked(perm), p1_loc, p2_loc, side), perm
+
+    def __location_index(self, player):
+        """Return the cell index of the specified player, or NOT_MOVED if the
+        player has not been placed on the board yet.
+        """
+        if player == self._player_1:
+            return self._p1_loc
+        elif player == self._player_2:
+            return self._p2_loc
+        raise RuntimeError(
+            "Invalid player in get_player_location: {}".format(player))
+
+    def __has_moves(self, player):
+        """Test whether the specified player has at least one legal move. """
+        if player == self._player_1:
+            idx, moves = self._p1_loc, self._p1_moves
+        elif player == self._player_2:
+            idx, moves = self._p2_loc, self._p2_moves
+        else:
+            raise RuntimeError(
+                "Invalid player in get_player_location: {}".format(player))
+        if moves is not None:
+            return bool(moves)
+        if idx == Board.NOT_MOVED:
+            return self._blocked != self._full
+        return bool(self._masks[idx] & ~self._blocked)
+
+    def __get_moves(self, idx):
         """Generate the list of possible moves for an L-shaped motion (like a
-        knight in chess).
+        knight in chess) from the cell with index `idx`.
         """
-        if loc == Board.NOT_MOVED:
+        if idx == Board.NOT_MOVED:
             return self.get_blank_spaces()
 
-        r, c = loc
-        directions = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
-                      (1, -2), (1, 2), (2, -1), (2, 1)]
-        valid_moves = [(r + dr, c + dc) for dr, dc in directions
-                       if self.move_is_legal((r + dr, c + dc))]
-        random.shuffle(valid_moves)
+        blocked = self._blocked
+        valid_moves = [move for j, move in self._neighbors[idx]
+                       if not blocked >> j & 1]
+        if self._rng is not None:
+            self._rng.shuffle(valid_moves)
         return valid_moves
 
     def print_board(self):
@@ -271,29 +836,20 @@ class Board(object):
         the location of each player and indicating which cells have been
         blocked, and which remain open.
         """
-        p1_loc = self._board_state[-1]
-        p2_loc = self._board_state[-2]
-
         col_margin = len(str(self.height - 1)) + 1
         prefix = "{:<" + "{}".format(col_margin) + "}"
         offset = " " * (col_margin + 3)
-        out = offset + '   '.join(map(str, range(self.width))) + '\n\r'
+        cells = format(self._blocked, "b").zfill(self.width * self.height)[::-1]
+        marks = {self._p1_loc: symbols[0], self._p2_loc: symbols[1]}
+
+        lines = [offset + '   '.join(map(str, range(self.width)))]
         for i in range(self.height):
-            out += prefix.format(i) + ' | '
+            row = []
             for j in range(self.width):
                 idx = i + j * self.height
-                if not self._board_state[idx]:
-                    out += ' '
-                elif p1_loc == idx:
-                    out += symbols[0]
-                elif p2_loc == idx:
-                    out += symbols[1]
-                else:
-                    out += '-'
-                out += ' | '
-            out += '\n\r'
-
-        return out
+                row.append(' ' if cells[idx] == '0' else marks.get(idx, '-'))
+            lines.append(prefix.format(i) + ' | ' + ' | '.join(row) + ' | ')
+        return '\n\r'.join(lines) + '\n\r'
 
     def play(self, time_limit=TIME_LIMIT_MILLIS):
         """Execute a match between the players by alternately soliciting them
@@ -314,29 +870,60 @@ class Board(object):
         """
         move_history = []
 
-        time_millis = lambda: 1000 * timeit.default_timer()
+        for record in self.iter_play(time_limit):
+            if record.termination is not None:
+                return record.winner, move_history, record.termination
+            move_history.append(list(record.move))
+
+    def iter_play(self, time_limit=TIME_LIMIT_MILLIS):
+        """Execute a match like play(), but as a generator that yields a
+        record after every ply, so that a game can be streamed, inspected
+        (the board has already been updated when a record is yielded) or
+        stopped mid-game.
 
+        Parameters
+        ----------
+        time_limit : numeric (optional)
+            The maximum number of milliseconds to allow before timeout
+            during each turn.
+
+        Yields
+        ----------
+        MoveRecord
+            The ply number, the player that moved, its move, the milliseconds
+            it used and had left, and the number of legal moves it had to
+            choose from. The final record describes the turn that lost the
+            game and also holds the winning player and a string indicating
+            the reason for losing (e.g., timeout or invalid move).
+        """
         while True:
 
             legal_player_moves = self.get_legal_moves()
             game_copy = self.copy()
 
-            move_start = time_millis()
-            time_left = lambda : time_limit - (time_millis() - move_start)
+            time_left = Timer(time_limit)
             curr_move = self._active_player.get_move(game_copy, time_left)
             move_end = time_left()
 
             if curr_move is None:
                 curr_move = Board.NOT_MOVED
 
+            termination = None
             if move_end < 0:
-                return self._inactive_player, move_history, "timeout"
-
-            if curr_move not in legal_player_moves:
+                termination = "timeout"
+            elif curr_move not in legal_player_moves:
                 if len(legal_player_moves) > 0:
-                    return self._inactive_player, move_history, "forfeit"
-                return self._inactive_player, move_history, "illegal move"
+                    termination = "forfeit"
+                else:
+                    termination = "illegal move"
+
+            record = MoveRecord(self.move_count, self._active_player, curr_move,
+                                time_limit - move_end, move_end,
+                                len(legal_player_moves), None, termination)
 
-            move_history.append(list(curr_move))
+            if termination is not None:
+                yield record._replace(winner=self._inactive_player)
+                return
 
             self.apply_move(curr_move)
+            yield record
@@ -8,6 +8,11 @@ own agent and example heuristic functions.
 
 from random import randint
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 def null_score(game, player):
     """This heuristic presumes no knowledge for non-terminal states, and
@@ -100,6 +105,29 @@ def improved_score(game, player):
     return float(own_moves - opp_moves)
 
 
+def improved_score_batch(batch, player):
+    """Batched counterpart of `improved_score` that scores every position of
+    an `isolation.BoardBatch` at once.
+
+    Parameters
+    ----------
+    batch : `isolation.BoardBatch`
+        A batch of game states (e.g., all children of a search node).
+
+    player : hashable
+        One of the objects registered by the batch as a valid player.
+
+    Returns
+    ----------
+    numpy.ndarray
+        The heuristic value of each game state in the batch
+    """
+    side = batch.side(player)
+    values = batch.terminal_values(player)
+    scores = batch.legal_move_counts(side) - batch.legal_move_counts(1 - side)
+    return np.where(values == 0, scores.astype(float), values)
+
+
 def center_score(game, player):
     """Outputs a score equal to square of the distance from the center of the
     board to the position of the player.
@@ -37,12 +37,17 @@ game_agent.py.
 Agent = namedtuple("Agent", ["player", "name"])
 
 
-def play_round(cpu_agent, test_agents, win_counts, num_matches):
+def play_round(cpu_agent, test_agents, win_counts, num_matches,
+               search_stats=None):
     """Compare the test agents to the cpu agent in "fair" matches.
 
     "Fair" matches use random starting locations and force the agents to
     play as both first and second player to control for advantages resulting
     from choosing better opening moves or having first initiative to move.
+
+    If a search_stats dict is given, the `SearchStats` record left by every
+    move of an agent that collects them is appended to the list stored in
+    the dict for that agent's player.
     """
     timeout_count = 0
     forfeit_count = 0
@@ -60,7 +65,11 @@ def play_round(cpu_agent, test_agents, win_counts, num_matches):
 
         # play all games and tally the results
         for game in games:
-            winner, _, termination = game.play(time_limit=TIME_LIMIT)
+            for record in game.iter_play(time_limit=TIME_LIMIT):
+                stats = getattr(record.player, "stats", None)
+                if search_stats is not None and stats is not None:
+                    search_stats.setdefault(record.player, []).append(stats)
+            winner, termination = record.winner, record.termination
             win_counts[winner] += 1
 
             if termination == "timeout":
@@ -77,11 +86,26 @@ def update(total_wins, wins):
     return total_wins
 
 
+def summarize_stats(records):
+    """Return the mean nodes, nodes per second, completed depth, cutoffs and
+    transposition table hits per move of a list of `SearchStats` records.
+    """
+    count = float(len(records))
+    time_used = sum(r.time_used for r in records)
+    nodes = sum(r.nodes for r in records)
+    return (nodes / count,
+            nodes / time_used * 1000. if time_used else 0.,
+            sum(r.depth_completed for r in records) / count,
+            sum(r.cutoffs for r in records) / count,
+            sum(r.tt_hits for r in records) / count)
+
+
 def play_matches(cpu_agents, test_agents, num_matches):
     """Play matches between the test agent and each cpu_agent individually. """
     total_wins = {agent.player: 0 for agent in test_agents}
     total_timeouts = 0.
     total_forfeits = 0.
+    search_stats = {}
     total_matches = 2 * num_matches * len(cpu_agents)
 
     print("\n{:^9}{:^13}".format("Match #", "Opponent") + ''.join(['{:^13}'.format(x[1].name) for x in enumerate(test_agents)]))
@@ -93,7 +117,8 @@ def play_matches(cpu_agents, test_agents, num_matches):
 
         print("{!s:^9}{:^13}".format(idx + 1, agent.name), end="", flush=True)
 
-        counts = play_round(agent, test_agents, wins, num_matches)
+        counts = play_round(agent, test_agents, wins, num_matches,
+                            search_stats)
         total_timeouts += counts[0]
         total_forfeits += counts[1]
         total_wins = update(total_wins, wins)
@@ -114,6 +139,14 @@ def play_matches(cpu_agents, test_agents, num_matches):
             ) for x in enumerate(test_agents)
     ]))
 
+    measured = [agent for agent in test_agents if agent.player in search_stats]
+    if measured:
+        print("\n{:^13}{:^12}{:^12}{:^10}{:^12}{:^10}".format(
+            "Agent", "Nodes/move", "Nodes/sec", "Depth", "Cutoffs", "TT hits"))
+        for agent in measured:
+            print("{:^13}{:^12.0f}{:^12.0f}{:^10.2f}{:^12.1f}{:^10.1f}".format(
+                agent.name, *summarize_stats(search_stats[agent.player])))
+
     if total_timeouts:
         print(("\nThere were {} timeouts during the tournament -- make sure " +
                "your agent handles search timeout correctly, and consider " +
@@ -129,10 +162,14 @@ def main():
     # Define two agents to compare -- these agents will play from the same
     # starting position against the same adversaries in the tournament
     test_agents = [
-        Agent(AlphaBetaPlayer(score_fn=improved_score), "AB_Improved"),
-        Agent(AlphaBetaPlayer(score_fn=custom_score), "AB_Custom"),
-        Agent(AlphaBetaPlayer(score_fn=custom_score_2), "AB_Custom_2"),
-        Agent(AlphaBetaPlayer(score_fn=custom_score_3), "AB_Custom_3")
+        Agent(AlphaBetaPlayer(score_fn=improved_score, collect_stats=True),
+              "AB_Improved"),
+        Agent(AlphaBetaPlayer(score_fn=custom_score, collect_stats=True),
+              "AB_Custom"),
+        Agent(AlphaBetaPlayer(score_fn=custom_score_2, collect_stats=True),
+              "AB_Custom_2"),
+        Agent(AlphaBetaPlayer(score_fn=custom_score_3, collect_stats=True),
+              "AB_Custom_3")
     ]
 
     # Define a collection of agents to compete against the test agents